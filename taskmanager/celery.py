@@ -14,6 +14,9 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 # Autodiscover tasks in all installed apps
 app.autodiscover_tasks()
 
+# Register the beat schedule
+from . import celeryconfig  # noqa: E402,F401
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
@@ -6,4 +6,21 @@ app.conf.beat_schedule = {
         "task": "tasks.tasks.send_task_deadline_reminder",
         "schedule": crontab(minute=0, hour="*"),
     },
+    "reconcile_task_stats_daily": {
+        "task": "tasks.tasks.reconcile_task_stats",
+        "schedule": crontab(minute=30, hour=3),
+    },
+    "refresh_task_rollups_every_15_minutes": {
+        "task": "tasks.tasks.refresh_task_rollups",
+        "schedule": crontab(minute="*/15"),
+    },
+    "purge_task_tombstones_daily": {
+        "task": "tasks.tasks.purge_task_tombstones",
+        "schedule": crontab(minute=45, hour=3),
+    },
+    # Fallback for when no dispatch_outbox process is listening.
+    "dispatch_task_outbox_every_minute": {
+        "task": "tasks.tasks.dispatch_task_outbox",
+        "schedule": crontab(minute="*"),
+    },
 }
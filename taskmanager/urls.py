@@ -21,6 +21,8 @@ from rest_framework.permissions import AllowAny
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from tasks.async_views import TaskDetailView, TaskListView, TaskReportView
+from tasks.schema import TaskSchemaGenerator
 from tasks.views import TasksViewSet
 from users.views import UserAuthViewSet, UserDetailViewSet
 
@@ -31,6 +33,7 @@ schema_view = get_schema_view(
     ),
     public=True,
     permission_classes=(AllowAny,),
+    generator_class=TaskSchemaGenerator,
 )
 
 router = DefaultRouter()
@@ -39,6 +42,11 @@ router.register(r"detail", UserDetailViewSet, basename="detail")
 router.register(r"tasks", TasksViewSet, basename="tasks")
 
 urlpatterns = [
+    # Async views for the busiest task endpoints; the rest of /api/tasks/
+    # comes from TasksViewSet.
+    path("api/tasks/", TaskListView.as_view(), name="tasks-list"),
+    path("api/tasks/report/", TaskReportView.as_view(), name="tasks-report"),
+    path("api/tasks/<int:pk>/", TaskDetailView.as_view(), name="tasks-detail"),
     path("api/", include(router.urls)),
     path("admin/", admin.site.urls),
     re_path(
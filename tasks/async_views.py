@@ -0,0 +1,298 @@
+import math
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import (
+    AuthenticationFailed,
+    NotAuthenticated,
+    Throttled,
+)
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_204_NO_CONTENT,
+    HTTP_400_BAD_REQUEST,
+)
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from users.models import User
+from .broadcast import changed_fields
+from .cache import (
+    LIST_CACHE_TIMEOUT,
+    LIST_NAMESPACE,
+    REPORT_CACHE_TIMEOUT,
+    REPORT_NAMESPACE,
+    aget_or_compute,
+    anamespaced_key,
+)
+from .conditional import list_etag, set_validators, task_validators
+from .filters import filter_tasks
+from .models import Task
+from .outbox import record_task_created, record_task_updated
+from .pagination import TaskCursorPagination, task_paginator
+from .serializers import TaskSerializer
+from .stats import aget_report
+from .views import TasksViewSet
+
+# Route - /tasks/, /tasks/{id}/ and /tasks/report/ on the ASGI event loop.
+
+
+def json_response(data, status=HTTP_200_OK, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status,
+        content_type="application/json",
+        headers=headers,
+    )
+
+
+def task_queryset():
+    return TasksViewSet.queryset.all()
+
+
+class AsyncUserRateThrottle(UserRateThrottle):
+    """``UserRateThrottle`` that keeps its request history through the async cache API."""
+
+    async def aallow_request(self, request):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, None)
+        if self.key is None:
+            return True
+
+        self.history = await self.cache.aget(self.key, [])
+        self.now = self.timer()
+        while self.history and self.history[-1] <= self.now - self.duration:
+            self.history.pop()
+        if len(self.history) >= self.num_requests:
+            return self.throttle_failure()
+        self.history.insert(0, self.now)
+        await self.cache.aset(self.key, self.history, self.duration)
+        return True
+
+
+class AsyncTaskView(View):
+    """
+    Base for task endpoints served natively on the ASGI event loop.
+
+    Authentication, throttling and the response shapes follow
+    ``TasksViewSet``; reads use the async ORM and cache so a slow client or
+    Redis round trip never holds a thread. Writes that need a transaction
+    run as one ``sync_to_async`` call, since ``atomic()`` is sync-only.
+    """
+
+    authentication_class = JWTAuthentication
+    throttle_class = AsyncUserRateThrottle
+    parser_classes = (JSONParser, FormParser, MultiPartParser)
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Bearer tokens are not sent automatically by browsers, so CSRF does
+        # not apply, exactly as for the DRF views.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            user = await self.authenticate(request)
+            if user is None:
+                raise NotAuthenticated()
+            request = Request(request, parsers=[parser() for parser in self.parser_classes])
+            request.user = user
+            throttle = self.throttle_class()
+            if not await throttle.aallow_request(request):
+                raise Throttled(throttle.wait())
+        except (AuthenticationFailed, NotAuthenticated, Throttled) as error:
+            return self.error_response(error)
+        self.request = request
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def authenticate(self, request):
+        # Honour APIClient.force_authenticate() the way DRF's Request does.
+        forced = getattr(request, "_force_auth_user", None)
+        if forced is not None:
+            return forced
+        authentication = self.authentication_class()
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header else None
+        if raw_token is None:
+            return None
+        token = authentication.get_validated_token(raw_token)
+        return await sync_to_async(authentication.get_user)(token)
+
+    def error_response(self, error):
+        headers = {}
+        if isinstance(error, (AuthenticationFailed, NotAuthenticated)):
+            headers["WWW-Authenticate"] = self.authentication_class().authenticate_header(None)
+        if isinstance(error, Throttled) and error.wait is not None:
+            headers["Retry-After"] = str(math.ceil(error.wait))
+        data = error.detail if isinstance(error.detail, (list, dict)) else {"detail": error.detail}
+        return json_response(data, error.status_code, headers)
+
+
+@sync_to_async
+def save_new_task(fields):
+    """Create a task and commit its side effects to the outbox along with it."""
+    with transaction.atomic():
+        task = Task.objects.create(**fields)
+        if task.due_date:
+            # Serialize the stored value rather than the raw request input.
+            task.refresh_from_db(fields=["due_date"])
+        data = TaskSerializer(task).data
+        record_task_created(task, data)
+    return data
+
+
+@sync_to_async
+def save_task_update(request, pk):
+    """
+    Apply a partial update under a row lock.
+
+    Returns ``(serializer, None)``, or ``(None, response)`` when an
+    ``If-Match``/``If-Unmodified-Since`` check fails. The broadcast and any
+    reminder are committed to the outbox with the update.
+    """
+    with transaction.atomic():
+        task = get_object_or_404(
+            task_queryset().select_for_update(of=("self",)), id=pk, created_by=request.user
+        )
+        # If-Match is checked against the locked row so two clients
+        # holding the same ETag cannot both overwrite it.
+        etag, last_modified = task_validators(task)
+        precondition_failed = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if precondition_failed is not None:
+            return None, precondition_failed
+
+        old_due_date, old_status = task.due_date, task.status
+        serializer = TaskSerializer(task, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        before = {field: getattr(task, field) for field in serializer.validated_data}
+        serializer.save()
+        record_task_updated(
+            task,
+            serializer.data,
+            changed_fields(task, before),
+            rescheduled=(task.due_date, task.status) != (old_due_date, old_status),
+        )
+    return serializer, None
+
+
+class TaskListView(AsyncTaskView):
+    async def get(self, request):
+        query_string = urlencode(sorted(request.GET.dict().items()))
+
+        async def build_page():
+            tasks = filter_tasks(task_queryset(), request.GET).order_by("-created_at", "-id")
+            paginator = task_paginator(request)
+            page = await paginator.apaginate_queryset(tasks, request, self)
+
+            if page is None:
+                tasks = [task async for task in tasks]
+                data = TaskSerializer(tasks, many=True).data
+                return {"data": data, "etag": list_etag(query_string, tasks, len(tasks))}
+            if isinstance(paginator, TaskCursorPagination):
+                position = (paginator.has_previous, paginator.has_next)
+            else:
+                position = paginator.page.paginator.count
+            serializer = TaskSerializer(page, many=True)
+            data = paginator.get_paginated_response(serializer.data).data
+            return {"data": data, "etag": list_etag(query_string, page, position)}
+
+        try:
+            # The ETag is cached with the page, so a revalidation that hits the
+            # cache answers 304 without touching the database.
+            key = await anamespaced_key(LIST_NAMESPACE, f"{request.user.id}:{query_string}")
+            cached = await aget_or_compute(key, build_page, LIST_CACHE_TIMEOUT, LIST_NAMESPACE)
+            not_modified = get_conditional_response(request, etag=cached["etag"])
+            if not_modified is not None:
+                return not_modified
+
+            response = json_response(cached["data"])
+            return set_validators(response, cached["etag"], None)
+        except Exception as error:
+            return json_response({"message": str(error)}, HTTP_400_BAD_REQUEST)
+
+    async def post(self, request):
+        try:
+            title = request.data.get("title")
+            assigned_to = request.data.get("assigned_to")
+            if not title or not assigned_to:
+                return json_response(
+                    {"message": "Title and Assigned To fields are required"},
+                    HTTP_400_BAD_REQUEST,
+                )
+
+            # Choices are checked here so the list filters and TaskStats only
+            # ever see the stored lowercase values.
+            serializer = TaskSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            assigned_to = await aget_object_or_404(User, email=assigned_to)
+            data = await save_new_task(
+                {
+                    **serializer.validated_data,
+                    "assigned_to": assigned_to,
+                    "created_by": request.user,
+                }
+            )
+            return json_response({"message": "Task Created", "data": data}, HTTP_201_CREATED)
+        except Exception as error:
+            return json_response({"message": str(error)}, HTTP_400_BAD_REQUEST)
+
+
+class TaskDetailView(AsyncTaskView):
+    async def get(self, request, pk):
+        try:
+            task = await aget_object_or_404(task_queryset(), id=pk)
+            etag, last_modified = task_validators(task)
+            not_modified = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if not_modified is not None:
+                return not_modified
+
+            response = json_response(TaskSerializer(task).data)
+            return set_validators(response, etag, last_modified)
+        except Exception as error:
+            return json_response({"message": str(error)}, HTTP_400_BAD_REQUEST)
+
+    async def put(self, request, pk):
+        try:
+            serializer, precondition_failed = await save_task_update(request, pk)
+            if precondition_failed is not None:
+                return precondition_failed
+
+            response = json_response({"message": "Task Updated", "data": serializer.data})
+            return set_validators(response, *task_validators(serializer.instance))
+        except Exception as error:
+            return json_response({"message": str(error)}, HTTP_400_BAD_REQUEST)
+
+    async def delete(self, request, pk):
+        try:
+            task = await aget_object_or_404(Task, id=pk, created_by=request.user)
+            await task.adelete()
+            return json_response({"message": "Task Deleted"}, HTTP_204_NO_CONTENT)
+        except Exception as error:
+            return json_response({"message": str(error)}, HTTP_400_BAD_REQUEST)
+
+
+class TaskReportView(AsyncTaskView):
+    async def get(self, request):
+        try:
+            key = await anamespaced_key(REPORT_NAMESPACE, "all")
+            report = await aget_or_compute(
+                key, aget_report, REPORT_CACHE_TIMEOUT, REPORT_NAMESPACE
+            )
+            return json_response(report)
+        except Exception as error:
+            return json_response({"message": str(error)}, HTTP_400_BAD_REQUEST)
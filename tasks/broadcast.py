@@ -0,0 +1,64 @@
+from channels.layers import get_channel_layer
+
+from .events import aappend_events
+
+
+def user_group(user_id):
+    return f"user_{user_id}"
+
+
+def task_audience(task):
+    """Users who hear about changes to ``task``: its assignee and its creator."""
+    return {task.assigned_to_id, task.created_by_id}
+
+
+def changed_fields(task, before):
+    """
+    Names of the fields of ``task`` that differ from the ``before`` snapshot.
+
+    Saving always moves ``updated_at``, and a status change also moves
+    ``status_changed_at``, so both are reported alongside the edited fields.
+    """
+    changed = {field for field, value in before.items() if getattr(task, field) != value}
+    changed.add("updated_at")
+    if "status" in changed:
+        changed.add("status_changed_at")
+    return sorted(changed)
+
+
+def task_event(op, data, changed=None):
+    """
+    One entry of a ``send_task_events`` message.
+
+    ``data`` is the task as already serialized for the HTTP response; it is
+    carried whole so consumers can evaluate subscriptions, while ``changed``
+    names the fields that go out to clients for an update.
+    """
+    event = {"op": op, "id": data["id"], "task": data}
+    if changed is not None:
+        event["changed"] = changed
+    return event
+
+
+async def group_send_many(events):
+    """Send ``{group: event}`` over one channel-layer connection."""
+    channel_layer = get_channel_layer()
+    for group, event in events.items():
+        await channel_layer.group_send(group, event)
+
+
+async def asend_to_audiences(audiences):
+    """
+    Send each user in ``{user_id: [task events]}`` one channel-layer message.
+
+    Messages are appended to the user's event log first, so a socket that
+    reconnects can replay what it missed by event id.
+    """
+    messages = {}
+    for user_id, events in sorted(audiences.items()):
+        messages[user_group(user_id)] = {
+            "type": "send_task_events",
+            "event_id": await aappend_events(user_id, events),
+            "events": events,
+        }
+    await group_send_many(messages)
@@ -0,0 +1,203 @@
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+from django.utils.timezone import now
+
+from users.models import User
+from .broadcast import changed_fields
+from .cache import bump_task_namespaces
+from .models import Task, TaskTombstone
+from .outbox import record_bulk_written
+from .serializers import TaskSerializer
+from .stats import apply_stats_delta, stats_key
+
+BULK_MAX_ITEMS = 5000
+BULK_BATCH_SIZE = 1000
+BULK_OPERATIONS = ("create", "update", "delete")
+
+# Tombstones are written in the same statement, as no post_delete signal fires.
+DELETE_TASKS_SQL = """
+    WITH deleted AS (
+        DELETE FROM {task}
+        WHERE id = ANY(%s) AND created_by_id = %s
+        RETURNING id, status, priority, assigned_to_id, created_by_id
+    ), tombstones AS (
+        INSERT INTO {tombstone} (task_id, deleted_at)
+        SELECT id, clock_timestamp() FROM deleted
+    )
+    SELECT id, status, priority, assigned_to_id, created_by_id FROM deleted
+"""
+
+
+def is_task_id(value):
+    # JSON true would otherwise pass as 1.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class BulkResult:
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        # The created and updated tasks as serialized for the response and broadcasts.
+        self.created_data = []
+        self.updated_data = []
+        # Updated task id -> names of the fields that changed.
+        self.changed = {}
+        self.deleted = []
+        # Deleted task id -> the users who should hear about it.
+        self.deleted_audience = {}
+        # Updated tasks whose deadline or status changed, for reminder scheduling.
+        self.rescheduled = []
+        self.errors = {}
+        self.deltas = {}
+
+    def error(self, operation, index, errors):
+        self.errors.setdefault(operation, []).append({"index": index, "errors": errors})
+
+    def count(self, key, delta):
+        self.deltas[key] = self.deltas.get(key, 0) + delta
+
+
+def parse_bulk_payload(data):
+    if not isinstance(data, dict) or not any(data.get(op) for op in BULK_OPERATIONS):
+        raise ValueError("Expected at least one of: create, update, delete")
+    operations = {}
+    for op in BULK_OPERATIONS:
+        items = data.get(op) or []
+        if not isinstance(items, list):
+            raise ValueError(f"'{op}' must be a list")
+        operations[op] = items
+    if sum(len(items) for items in operations.values()) > BULK_MAX_ITEMS:
+        raise ValueError(f"A bulk request may contain at most {BULK_MAX_ITEMS} items")
+    return operations
+
+
+def apply_bulk(data, user):
+    """
+    Create, partially update and delete tasks in one transaction.
+
+    Items are validated individually: an invalid item is reported in
+    ``errors`` by its index and skipped, the rest are written with one
+    ``bulk_create``, one ``bulk_update`` and one ``DELETE ... RETURNING``.
+    None of these send model signals, so ``TaskStats`` and the cache
+    namespaces are maintained here, once for the whole batch. Assignment
+    mails, reminders and broadcasts are committed to the outbox with it.
+    """
+    operations = parse_bulk_payload(data)
+    result = BulkResult()
+    with transaction.atomic():
+        create_tasks(operations["create"], user, result)
+        update_tasks(operations["update"], user, result)
+        delete_tasks(operations["delete"], user, result)
+        apply_stats_delta(result.deltas)
+        result.created_data = TaskSerializer(result.created, many=True).data
+        result.updated_data = TaskSerializer(result.updated, many=True).data
+        record_bulk_written(result)
+        transaction.on_commit(bump_task_namespaces)
+    return result
+
+
+def create_tasks(items, user, result):
+    emails = {
+        item["assigned_to"].lower()
+        for item in items
+        if isinstance(item, dict) and isinstance(item.get("assigned_to"), str)
+    }
+    assignees = {
+        assignee.email.lower(): assignee
+        for assignee in User.objects.alias(email_lower=Lower("email")).filter(
+            email_lower__in=emails
+        )
+    }
+
+    tasks = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            result.error("create", index, {"non_field_errors": ["Expected an object"]})
+            continue
+        serializer = TaskSerializer(data=item)
+        errors = {} if serializer.is_valid() else dict(serializer.errors)
+        email = item.get("assigned_to")
+        assignee = assignees.get(email.lower()) if isinstance(email, str) else None
+        if assignee is None:
+            errors["assigned_to"] = [
+                "No user with this email" if email else "This field is required."
+            ]
+        if errors:
+            result.error("create", index, errors)
+            continue
+        tasks.append(Task(**serializer.validated_data, assigned_to=assignee, created_by=user))
+
+    result.created = Task.objects.bulk_create(tasks, batch_size=BULK_BATCH_SIZE)
+    for task in result.created:
+        result.count(stats_key(task), 1)
+
+
+def update_tasks(items, user, result):
+    ids = [item.get("id") for item in items if isinstance(item, dict)]
+    tasks = {
+        task.id: task
+        for task in Task.objects.select_for_update(of=("self",))
+        .select_related("assigned_to", "created_by")
+        .defer("search_vector")
+        .filter(id__in=[pk for pk in ids if is_task_id(pk)], created_by=user)
+    }
+
+    fields, seen, timestamp = {"updated_at"}, set(), now()
+    for index, item in enumerate(items):
+        pk = item.get("id") if isinstance(item, dict) else None
+        task = tasks.get(pk) if is_task_id(pk) else None
+        if task is None or task.id in seen:
+            result.error("update", index, {"id": ["Not found or repeated"]})
+            continue
+        serializer = TaskSerializer(task, data=item, partial=True)
+        if not serializer.is_valid():
+            result.error("update", index, dict(serializer.errors))
+            continue
+
+        seen.add(task.id)
+        old_key, old_due_date = stats_key(task), task.due_date
+        before = {attr: getattr(task, attr) for attr in serializer.validated_data}
+        for attr, value in serializer.validated_data.items():
+            setattr(task, attr, value)
+        fields.update(serializer.validated_data)
+        if task.status != old_key[0]:
+            task.status_changed_at = timestamp
+            fields.add("status_changed_at")
+        if task.due_date != old_due_date:
+            task.reminded_at = None
+            fields.add("reminded_at")
+        if task.status != old_key[0] or task.due_date != old_due_date:
+            result.rescheduled.append(task)
+        if stats_key(task) != old_key:
+            result.count(old_key, -1)
+            result.count(stats_key(task), 1)
+        task.updated_at = timestamp
+        result.changed[task.id] = changed_fields(task, before)
+        result.updated.append(task)
+
+    if result.updated:
+        Task.objects.bulk_update(result.updated, sorted(fields), batch_size=BULK_BATCH_SIZE)
+
+
+def delete_tasks(items, user, result):
+    ids = [pk for pk in items if is_task_id(pk)]
+    rows = []
+    if ids:
+        with connection.cursor() as cursor:
+            sql = DELETE_TASKS_SQL.format(
+                task=Task._meta.db_table, tombstone=TaskTombstone._meta.db_table
+            )
+            cursor.execute(sql, [ids, user.id])
+            rows = cursor.fetchall()
+
+    deleted = set()
+    for pk, status, priority, assigned_to_id, created_by_id in rows:
+        deleted.add(pk)
+        result.count((status, priority), -1)
+        result.deleted_audience[pk] = {assigned_to_id, created_by_id}
+    for index, pk in enumerate(items):
+        if is_task_id(pk) and pk in deleted:
+            result.deleted.append(pk)
+            deleted.discard(pk)
+        else:
+            result.error("delete", index, {"id": ["Not found or repeated"]})
@@ -0,0 +1,229 @@
+import asyncio
+import math
+import random
+import time
+from uuid import uuid4
+
+from django.core.cache import cache
+
+LIST_NAMESPACE = "tasks_list"
+LIST_CACHE_TIMEOUT = 60 * 60
+REPORT_NAMESPACE = "tasks_report"
+REPORT_CACHE_TIMEOUT = 5 * 60
+PIVOT_NAMESPACE = "tasks_pivot"
+PIVOT_CACHE_TIMEOUT = 5 * 60
+
+# How long an expired value may still be served while one worker recomputes it.
+STALE_TTL = 60
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2.0
+LOCK_POLL_INTERVAL = 0.05
+# XFetch aggressiveness; > 1 refreshes earlier, < 1 later.
+XFETCH_BETA = 1.0
+
+STATS_NAMESPACES = (LIST_NAMESPACE, REPORT_NAMESPACE, PIVOT_NAMESPACE)
+STATS_OUTCOMES = ("hit", "miss", "stale")
+
+
+def _version_key(namespace):
+    return f"ns:{namespace}"
+
+
+def _seed_version():
+    # Seeded from the clock so a counter lost to eviction or a Redis restart
+    # never comes back at a version older entries were written under.
+    return time.time_ns() // 1000
+
+
+def get_namespace_version(namespace):
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _seed_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_namespace_version(namespace):
+    key = _version_key(namespace)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _seed_version(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_namespace(namespace):
+    """
+    Invalidate every entry under ``namespace`` in O(1).
+
+    Entries embed the namespace version in their key, so incrementing the
+    version orphans them all without scanning Redis; they age out on TTL.
+    """
+    key = _version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, _seed_version(), timeout=None)
+        return cache.get(key)
+
+
+def bump_task_namespaces():
+    """Invalidate every cache derived from the task table."""
+    for namespace in (LIST_NAMESPACE, REPORT_NAMESPACE, PIVOT_NAMESPACE):
+        bump_namespace(namespace)
+
+
+def namespaced_key(namespace, suffix):
+    return f"{namespace}:v{get_namespace_version(namespace)}:{suffix}"
+
+
+async def anamespaced_key(namespace, suffix):
+    return f"{namespace}:v{await aget_namespace_version(namespace)}:{suffix}"
+
+
+def _stats_key(namespace, outcome):
+    return f"cache_stats:{namespace}:{outcome}"
+
+
+def _record(namespace, outcome):
+    key = _stats_key(namespace, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+async def _arecord(namespace, outcome):
+    key = _stats_key(namespace, outcome)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, timeout=None)
+        await cache.aincr(key)
+
+
+def get_cache_stats():
+    keys = {
+        _stats_key(namespace, outcome): (namespace, outcome)
+        for namespace in STATS_NAMESPACES
+        for outcome in STATS_OUTCOMES
+    }
+    values = cache.get_many(keys)
+    stats = {namespace: dict.fromkeys(STATS_OUTCOMES, 0) for namespace in STATS_NAMESPACES}
+    for key, (namespace, outcome) in keys.items():
+        stats[namespace][outcome] = values.get(key, 0)
+    return stats
+
+
+def _should_refresh(entry):
+    # XFetch: recompute before expiry with a probability that rises as expiry
+    # approaches, scaled by how long the value took to compute last time.
+    jitter = -entry["delta"] * XFETCH_BETA * math.log(1.0 - random.random())
+    return time.time() + jitter >= entry["expires_at"]
+
+
+def _compute_and_store(key, compute, timeout):
+    start = time.monotonic()
+    value = compute()
+    entry = {
+        "value": value,
+        "delta": time.monotonic() - start,
+        "expires_at": time.time() + timeout,
+    }
+    cache.set(key, entry, timeout + STALE_TTL)
+    return value
+
+
+def get_or_compute(key, compute, timeout, namespace):
+    """
+    Single-flight read-through cache for ``key``.
+
+    Only the worker that wins a short lock recomputes an expired (or
+    probabilistically early-refreshed) value. Everyone else keeps serving
+    the previous value for up to ``STALE_TTL``, or, on a cold key, polls
+    briefly for the winner's result instead of hitting the database too.
+    """
+    entry = cache.get(key)
+    if entry is not None and not _should_refresh(entry):
+        _record(namespace, "hit")
+        return entry["value"]
+
+    lock_key = f"lock:{key}"
+    token = uuid4().hex
+    if cache.add(lock_key, token, LOCK_TIMEOUT):
+        try:
+            _record(namespace, "miss")
+            return _compute_and_store(key, compute, timeout)
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    if entry is not None:
+        expired = time.time() >= entry["expires_at"]
+        _record(namespace, "stale" if expired else "hit")
+        return entry["value"]
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            _record(namespace, "hit")
+            return entry["value"]
+
+    # The lock holder is slow or died; don't keep the request waiting.
+    _record(namespace, "miss")
+    return _compute_and_store(key, compute, timeout)
+
+
+async def _acompute_and_store(key, compute, timeout):
+    start = time.monotonic()
+    value = await compute()
+    entry = {
+        "value": value,
+        "delta": time.monotonic() - start,
+        "expires_at": time.time() + timeout,
+    }
+    await cache.aset(key, entry, timeout + STALE_TTL)
+    return value
+
+
+async def aget_or_compute(key, compute, timeout, namespace):
+    """
+    :func:`get_or_compute` for async views; ``compute`` is a coroutine function.
+
+    Waiting for another worker's result sleeps on the event loop instead of
+    holding a thread.
+    """
+    entry = await cache.aget(key)
+    if entry is not None and not _should_refresh(entry):
+        await _arecord(namespace, "hit")
+        return entry["value"]
+
+    lock_key = f"lock:{key}"
+    token = uuid4().hex
+    if await cache.aadd(lock_key, token, LOCK_TIMEOUT):
+        try:
+            await _arecord(namespace, "miss")
+            return await _acompute_and_store(key, compute, timeout)
+        finally:
+            if await cache.aget(lock_key) == token:
+                await cache.adelete(lock_key)
+
+    if entry is not None:
+        expired = time.time() >= entry["expires_at"]
+        await _arecord(namespace, "stale" if expired else "hit")
+        return entry["value"]
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        entry = await cache.aget(key)
+        if entry is not None:
+            await _arecord(namespace, "hit")
+            return entry["value"]
+
+    await _arecord(namespace, "miss")
+    return await _acompute_and_store(key, compute, timeout)
@@ -1,18 +1,71 @@
 # consumers.py
+import asyncio
 import json
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.db.models import Q
+
+from .broadcast import user_group
+from .events import read_events_since
+from .filters import compile_task_filter
+from .models import Task
+
+# Close codes in the 4000-4999 range are reserved for applications.
+CLOSE_UNAUTHENTICATED = 4401
+CLOSE_FORBIDDEN = 4403
+# Ids of forwarded tasks remembered per socket, so a task that stops matching
+# the subscription can be reported as removed.
+MAX_VISIBLE_TASKS = 10000
+# Events arriving within this many seconds are coalesced into one frame.
+FLUSH_INTERVAL = 0.05
+# Frames a socket may leave unacknowledged before further ones are held back.
+MAX_UNACKED_FRAMES = 20
+# Tasks held back for a lagging socket before it is told to resync instead.
+MAX_PENDING_TASKS = 1000
+
+
+@database_sync_to_async
+def can_follow_task(user, task_id):
+    return Task.objects.filter(
+        Q(assigned_to=user) | Q(created_by=user), id=task_id
+    ).exists()
+
 
 class TaskConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        # If task_id is provided (for updates), it will be added to the group name
+        # Every socket joins only its user's group; writes are published to the
+        # groups of the task's assignee and creator.
+        self.user = self.scope.get('user')
+        if self.user is None or not self.user.is_authenticated:
+            await self.close(code=CLOSE_UNAUTHENTICATED)
+            return
+
+        # If task_id is provided, only frames about that task are forwarded
         self.task_id = self.scope['url_route']['kwargs'].get('task_id', None)
-        
-        if self.task_id:
-            self.room_group_name = f'task_{self.task_id}'  # For updates, specific task group
-        else:
-            self.room_group_name = 'tasks'  # For creation, general task group
+        if self.task_id and not await can_follow_task(self.user, self.task_id):
+            await self.close(code=CLOSE_FORBIDDEN)
+            return
 
-        # Join the room group
+        self.room_group_name = user_group(self.user.id)
+        self.subscription = None
+        self.visible = set()
+        self.pending = {}
+        self.overflowed = False
+        self.flusher = None
+        # Highest event id queued, reported in frames, and the id up to which
+        # a resumed socket's replay already covered the log.
+        self.last_event_id = None
+        self.replayed_id = None
+        # Frames are numbered by ``seq``. A client that acknowledges them
+        # with {"action": "ack", "seq": n} gets flow control; one that never
+        # does is sent frames as they are ready.
+        self.sent_seq = 0
+        self.acked_seq = None
+        self.caught_up = asyncio.Event()
+
+        # Join the user's group
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
@@ -20,16 +73,53 @@ class TaskConsumer(AsyncWebsocketConsumer):
 
         await self.accept()
 
+        # ?last_event_id= resumes a dropped socket. The group is joined before
+        # the log is read, so live messages already covered by the replay are
+        # recognised by their id and skipped.
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        last_event_id = query.get('last_event_id', [''])[0]
+        if last_event_id.isdigit():
+            await self.replay(int(last_event_id))
+
     async def disconnect(self, close_code):
-        # Leave the room group
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        if getattr(self, 'flusher', None) is not None:
+            self.flusher.cancel()
+        # Leave the user's group (if the connection got that far)
+        if hasattr(self, 'room_group_name'):
+            await self.channel_layer.group_discard(
+                self.room_group_name,
+                self.channel_name
+            )
 
     async def receive(self, text_data):
         # Handle the message received from the WebSocket client
         text_data_json = json.loads(text_data)
+        action = text_data_json.get('action')
+
+        # {"action": "subscribe", "filters": {...}} uses the list endpoint's
+        # filter vocabulary; only matching task events are forwarded after it.
+        if action == 'subscribe':
+            filters = text_data_json.get('filters') or {}
+            try:
+                self.subscription = compile_task_filter(filters)
+            except (TypeError, ValueError, AttributeError) as error:
+                await self.send(text_data=json.dumps({'error': str(error)}))
+                return
+            self.visible.clear()
+            await self.send(text_data=json.dumps({'subscribed': filters}))
+            return
+        if action == 'unsubscribe':
+            self.subscription = None
+            self.visible.clear()
+            await self.send(text_data=json.dumps({'subscribed': None}))
+            return
+        if action == 'ack':
+            seq = text_data_json.get('seq')
+            if isinstance(seq, int) and not isinstance(seq, bool):
+                self.acked_seq = max(self.acked_seq or 0, min(seq, self.sent_seq))
+                self.caught_up.set()
+            return
+
         message = text_data_json['message']
 
         # Send message to WebSocket
@@ -37,11 +127,137 @@ class TaskConsumer(AsyncWebsocketConsumer):
             'message': message
         }))
 
-    # Send message to WebSocket
-    async def send_task_update(self, event):
-        message = event['message']
+    def matches(self, task):
+        """
+        Whether ``task`` passes the subscription, remembering forwarded ids.
 
-        # Send message to WebSocket
-        await self.send(text_data=json.dumps({
-            'message': message
-        }))
+        A task that no longer matches but was forwarded before is reported
+        as removed so the client can drop it from its slice.
+        """
+        if self.subscription is None:
+            return True
+        if self.subscription(task):
+            if len(self.visible) >= MAX_VISIBLE_TASKS:
+                self.visible.clear()
+            self.visible.add(task['id'])
+            return True
+        return False
+
+    def was_visible(self, task_id):
+        if task_id in self.visible:
+            self.visible.discard(task_id)
+            return True
+        return False
+
+    def coalesce(self, event):
+        """Fold ``event`` into the pending entry for its task, if any."""
+        task_id = event['id']
+        pending = self.pending.get(task_id)
+        if pending is None:
+            self.pending[task_id] = event
+        elif event['op'] == 'deleted':
+            if pending['op'] == 'created':
+                # The client never saw the task; nothing to send.
+                del self.pending[task_id]
+            else:
+                self.pending[task_id] = event
+        elif pending['op'] == 'created':
+            self.pending[task_id] = {**pending, 'task': event['task']}
+        else:
+            changed = set(pending.get('changed', ())) | set(event.get('changed', ()))
+            self.pending[task_id] = {**event, 'changed': sorted(changed)}
+
+    async def replay(self, last_event_id):
+        latest_id, entries = await read_events_since(self.user.id, last_event_id)
+        if entries is None:
+            # Too far behind to replay; the client reloads from the API.
+            self.last_event_id = self.replayed_id = latest_id
+            await self.send_frame({'resync': True, 'event_id': latest_id})
+            return
+        self.last_event_id = last_event_id
+        for event_id, events in entries:
+            self.queue_events(event_id, events)
+        self.replayed_id = latest_id
+
+    # Queue task events from the channel layer for the next flush
+    async def send_task_events(self, event):
+        self.queue_events(event.get('event_id'), event['events'])
+
+    def queue_events(self, event_id, events):
+        if event_id is not None:
+            # Only ids the replay covered are duplicates; live messages may
+            # arrive out of order and an older id is still news.
+            if self.replayed_id is not None and event_id <= self.replayed_id:
+                return
+            self.last_event_id = max(event_id, self.last_event_id or 0)
+        if self.overflowed:
+            return
+        for entry in events:
+            if self.task_id and entry['id'] != self.task_id:
+                continue
+            self.coalesce(entry)
+        if len(self.pending) > MAX_PENDING_TASKS:
+            # The client is not keeping up; drop the backlog and let it
+            # reload instead of buffering without bound.
+            self.pending.clear()
+            self.overflowed = True
+        if (self.pending or self.overflowed) and self.flusher is None:
+            self.flusher = asyncio.ensure_future(self.flush())
+
+    def lagging(self):
+        if self.acked_seq is None:
+            return False
+        return self.sent_seq - self.acked_seq >= MAX_UNACKED_FRAMES
+
+    async def send_frame(self, frame):
+        self.sent_seq += 1
+        await self.send(text_data=json.dumps({**frame, 'seq': self.sent_seq}))
+
+    async def flush(self):
+        """
+        Send everything queued during the flush window as one frame.
+
+        Created tasks and tasks entering the subscribed slice are sent whole;
+        other updates carry only their changed fields. Events that arrive
+        while a frame is being written wait for the next window. While the
+        client has ``MAX_UNACKED_FRAMES`` frames unacknowledged, nothing is
+        sent: events keep coalescing into the pending tasks until the
+        client catches up or their number overflows into a resync.
+        """
+        try:
+            while self.pending or self.overflowed:
+                await asyncio.sleep(FLUSH_INTERVAL)
+                while self.lagging():
+                    self.caught_up.clear()
+                    await self.caught_up.wait()
+                if self.overflowed:
+                    self.overflowed = False
+                    self.visible.clear()
+                    await self.send_frame({'resync': True, 'event_id': self.last_event_id})
+                    continue
+                pending, self.pending = self.pending, {}
+                batch = self.build_batch(pending.values())
+                if batch:
+                    await self.send_frame({'batch': batch, 'event_id': self.last_event_id})
+        finally:
+            self.flusher = None
+
+    def build_batch(self, events):
+        batch = {'created': [], 'updated': [], 'deleted': [], 'removed': []}
+        for event in events:
+            task_id = event['id']
+            if event['op'] == 'deleted':
+                self.visible.discard(task_id)
+                batch['deleted'].append(task_id)
+                continue
+            task = event['task']
+            entering = self.subscription is not None and task_id not in self.visible
+            if not self.matches(task):
+                if self.was_visible(task_id):
+                    batch['removed'].append(task_id)
+            elif event['op'] == 'created' or entering:
+                batch[event['op']].append(task)
+            else:
+                delta = {field: task[field] for field in event['changed'] if field in task}
+                batch['updated'].append({'id': task_id, **delta})
+        return {key: value for key, value in batch.items() if value}
@@ -0,0 +1,58 @@
+from django.core.cache import cache
+
+from .cache import _seed_version
+
+# Entries a reconnecting socket can catch up on before it must resync.
+EVENT_LOG_SIZE = 1000
+EVENT_LOG_TTL = 15 * 60
+
+
+def _sequence_key(user_id):
+    return f"task_events:{user_id}:seq"
+
+
+def _entry_key(user_id, event_id):
+    return f"task_events:{user_id}:{event_id}"
+
+
+async def aappend_events(user_id, events):
+    """
+    Record one channel-layer message for ``user_id`` and return its event id.
+
+    Each user has a stream-like log in the cache: a counter hands out
+    increasing ids and every entry lives for ``EVENT_LOG_TTL`` under its id.
+    A counter lost to eviction is reseeded from the clock, so ids never go
+    backwards and older ids are recognised as a gap.
+    """
+    key = _sequence_key(user_id)
+    try:
+        event_id = await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, _seed_version(), timeout=None)
+        event_id = await cache.aincr(key)
+    await cache.aset(_entry_key(user_id, event_id), events, EVENT_LOG_TTL)
+    return event_id
+
+
+async def read_events_since(user_id, last_event_id):
+    """
+    Return ``(latest_id, entries)`` for the events after ``last_event_id``.
+
+    ``entries`` is a list of ``(event_id, events)`` in order, or ``None``
+    when the gap cannot be replayed: it is longer than ``EVENT_LOG_SIZE``,
+    an entry has expired, or the id does not belong to the current log.
+    """
+    latest_id = await cache.aget(_sequence_key(user_id))
+    if latest_id is None or last_event_id > latest_id:
+        return latest_id, None
+    if latest_id - last_event_id > EVENT_LOG_SIZE:
+        return latest_id, None
+
+    keys = {
+        _entry_key(user_id, event_id): event_id
+        for event_id in range(last_event_id + 1, latest_id + 1)
+    }
+    found = await cache.aget_many(keys)
+    if len(found) != len(keys):
+        return latest_id, None
+    return latest_id, [(keys[key], found[key]) for key in keys]
@@ -0,0 +1,123 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F
+from django.db.models.functions import Lower, Upper
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import make_aware
+
+from .models import SEARCH_CONFIG
+
+FILTER_PARAMS = ("title", "description", "priority", "due_date", "status", "assigned_to")
+
+
+def parse_due_date(value):
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValueError(f"Invalid due_date '{value}', expected YYYY-MM-DD")
+    return day
+
+
+def filter_tasks(queryset, params):
+    """
+    Apply the task list endpoint's filter vocabulary to ``queryset``.
+
+    Every predicate is written so PostgreSQL can answer it from an index:
+    ``status``/``priority`` are stored as lowercase choice values so an exact
+    match on the lowercased input replaces ``__iexact``; ``due_date`` becomes a
+    half-open range instead of a ``::date`` cast; and the assignee email is
+    compared through ``lower()`` to match the functional index on users.
+    """
+    title = params.get("title")
+    description = params.get("description")
+    priority = params.get("priority")
+    due_date = params.get("due_date")
+    status = params.get("status")
+    assigned_to = params.get("assigned_to")
+
+    filters = {}
+    if title:
+        filters["title__icontains"] = title
+    if description:
+        filters["description__icontains"] = description
+    if priority:
+        filters["priority"] = priority.lower()
+    if due_date:
+        start = make_aware(datetime.combine(parse_due_date(due_date), time.min))
+        filters["due_date__gte"] = start
+        filters["due_date__lt"] = start + timedelta(days=1)
+    if status:
+        filters["status"] = status.lower()
+    if assigned_to:
+        queryset = queryset.alias(assignee_email=Lower("assigned_to__email"))
+        filters["assignee_email"] = assigned_to.lower()
+
+    return queryset.filter(**filters)
+
+
+def compile_task_filter(params):
+    """
+    Build an in-memory predicate over serialized tasks with the same meaning
+    as ``filter_tasks(queryset, params)``.
+
+    Used where rows never touch the database again, such as WebSocket
+    subscriptions, so each event is matched without a query.
+    """
+    unknown = set(params) - set(FILTER_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown filter '{sorted(unknown)[0]}'")
+
+    def contains(field, needle):
+        return lambda task: needle in (task.get(field) or "").upper()
+
+    def equals(field, expected):
+        return lambda task: (task.get(field) or "").lower() == expected
+
+    checks = []
+    for field in ("title", "description"):
+        if params.get(field):
+            checks.append(contains(field, params[field].upper()))
+    for field in ("priority", "status", "assigned_to"):
+        if params.get(field):
+            checks.append(equals(field, params[field].lower()))
+    if params.get("due_date"):
+        start = make_aware(datetime.combine(parse_due_date(params["due_date"]), time.min))
+        end = start + timedelta(days=1)
+
+        def due_on(task):
+            due_date = task.get("due_date")
+            if not due_date:
+                return False
+            due_date = parse_datetime(due_date) if isinstance(due_date, str) else due_date
+            return due_date is not None and start <= due_date < end
+
+        checks.append(due_on)
+
+    return lambda task: all(check(task) for check in checks)
+
+
+def search_tasks(queryset, query):
+    """
+    Rank ``queryset`` against ``query`` using the stored ``search_vector``.
+
+    Both paths are GIN index lookups. When full-text search finds nothing
+    (typically a misspelled word) fall back to trigram similarity on the
+    title, which tolerates typos.
+    """
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+    matches = queryset.filter(search_vector=search_query)
+    if matches.exists():
+        return matches.annotate(
+            rank=SearchRank(F("search_vector"), search_query)
+        ).order_by("-rank", "-id")
+
+    title = query.upper()
+    return (
+        queryset.alias(title_upper=Upper("title"))
+        .filter(title_upper__trigram_similar=title)
+        .annotate(rank=TrigramSimilarity(Upper("title"), title))
+        .order_by("-rank", "-id")
+    )
@@ -0,0 +1,219 @@
+import csv
+from io import StringIO, TextIOWrapper
+
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+
+from users.models import User
+from .cache import bump_task_namespaces
+from .exports import EXPORT_FIELDS, chunked
+from .models import Task, TaskOutbox
+from .reminders import REMINDER_WINDOW
+from .stats import apply_stats_delta
+
+IMPORT_CHUNK_SIZE = 5000
+EMAIL_CACHE_SIZE = 100000
+MAX_REPORTED_ERRORS = 100
+TITLE_MAX_LENGTH = Task._meta.get_field("title").max_length
+
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE task_import_staging (
+        title varchar(255) NOT NULL,
+        description text,
+        priority varchar(10) NOT NULL,
+        due_date timestamptz,
+        status varchar(15) NOT NULL,
+        assigned_to_id bigint NOT NULL,
+        created_by_id bigint NOT NULL
+    ) ON COMMIT DROP
+"""
+COPY_STAGING_SQL = """
+    COPY task_import_staging
+        (title, description, priority, due_date, status, assigned_to_id, created_by_id)
+    FROM STDIN WITH (FORMAT csv)
+"""
+STAGED_STATS_SQL = "SELECT status, priority, COUNT(*) FROM task_import_staging GROUP BY 1, 2"
+# Imported tasks count as already notified so a large load does not mail everyone.
+# Only the merged rows a deadline reminder may be due for come back.
+MERGE_STAGING_SQL = """
+    WITH merged AS (
+        INSERT INTO {task} (
+            title, description, priority, due_date, status, assigned_to_id, created_by_id,
+            created_at, updated_at, status_changed_at, assignment_notified_at
+        )
+        SELECT
+            title, description, priority, due_date, status, assigned_to_id, created_by_id,
+            now(), now(), now(), now()
+        FROM task_import_staging
+        RETURNING id, status, due_date
+    )
+    INSERT INTO {outbox} (task_id, kind, payload, created_at, available_at, attempts, last_error)
+    SELECT id, %s, '{{}}', now(), now(), 0, '' FROM merged
+    WHERE status = %s AND due_date <= %s
+"""
+
+
+class EmailResolver:
+    """
+    Map lowercased emails to user ids for the duration of an import.
+
+    Unknown emails of a chunk are resolved together in one query and kept,
+    misses included, so repeated addresses never go back to the database.
+    The cache is dropped once it holds ``max_size`` entries.
+    """
+
+    def __init__(self, max_size=EMAIL_CACHE_SIZE):
+        self.max_size = max_size
+        self.ids = {}
+
+    def resolve(self, emails):
+        missing = {email for email in emails if email and email not in self.ids}
+        if not missing:
+            return
+        if len(self.ids) + len(missing) > self.max_size:
+            self.ids.clear()
+        found = dict(
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=missing)
+            .values_list("email_lower", "id")
+        )
+        self.ids.update({email: found.get(email) for email in missing})
+
+    def get(self, email):
+        return self.ids.get(email)
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+
+    def reject(self, line, error):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+def clean_row(row, resolver, created_by_id=None):
+    """Validate one CSV record in the export layout and return the staging row."""
+    if len(row) != len(EXPORT_FIELDS):
+        raise ValueError(f"Expected {len(EXPORT_FIELDS)} columns, got {len(row)}")
+    title, description, priority, due_date, status, created_by, assigned_to = row
+
+    if not title:
+        raise ValueError("title is required")
+    if len(title) > TITLE_MAX_LENGTH:
+        raise ValueError(f"title is longer than {TITLE_MAX_LENGTH} characters")
+    priority = priority.lower() or Task.Priority.MEDIUM
+    if priority not in Task.Priority.values:
+        raise ValueError(f"Invalid priority '{priority}'")
+    status = status.lower() or Task.Status.PENDING
+    if status not in Task.Status.values:
+        raise ValueError(f"Invalid status '{status}'")
+    if due_date:
+        parsed = parse_datetime(due_date)
+        if parsed is None:
+            raise ValueError(f"Invalid due_date '{due_date}'")
+        due_date = make_aware(parsed) if is_naive(parsed) else parsed
+    else:
+        due_date = None
+
+    assigned_to_id = resolver.get(assigned_to.lower())
+    if assigned_to_id is None:
+        raise ValueError(f"Unknown assigned_to__email '{assigned_to}'")
+    if created_by_id is None:
+        created_by_id = resolver.get(created_by.lower())
+        if created_by_id is None:
+            raise ValueError(f"Unknown created_by__email '{created_by}'")
+    return [title, description or None, priority, due_date, status, assigned_to_id, created_by_id]
+
+
+def read_records(reader):
+    """Yield ``(line, row)`` pairs, turning malformed CSV into ``ValueError``."""
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    except csv.Error as error:
+        raise ValueError(f"Line {reader.line_num}: {error}") from error
+
+
+def import_tasks_csv(
+    fileobj, created_by=None, rejected=None, progress=None, chunk_size=IMPORT_CHUNK_SIZE
+):
+    """
+    Load a CSV in the export format into the task table.
+
+    ``fileobj`` is read as a binary stream one chunk of records at a time;
+    valid rows are streamed into a temporary staging table with ``COPY FROM
+    STDIN`` and merged with a single ``INSERT ... SELECT`` when the file is
+    exhausted, so memory stays bounded by ``chunk_size`` and the import is
+    all-or-nothing. Invalid records are written to the ``rejected`` text
+    stream with their line number and reason, while a file that is not
+    valid CSV aborts the import with a ``ValueError``. ``created_by``
+    overrides the file's creator column; ``progress`` is called with the
+    running :class:`ImportResult` after each chunk. Deadline reminders for
+    imported tasks already inside the horizon are queued in the outbox by
+    the merge itself.
+    """
+    reader = csv.reader(TextIOWrapper(fileobj, encoding="utf-8-sig", newline=""))
+    records = read_records(reader)
+    header = next(records, (None, None))[1]
+    if header != EXPORT_FIELDS:
+        raise ValueError(f"Expected CSV header: {','.join(EXPORT_FIELDS)}")
+
+    rejected_writer = None
+    if rejected is not None:
+        rejected_writer = csv.writer(rejected)
+        rejected_writer.writerow(["line", *EXPORT_FIELDS, "error"])
+
+    resolver = EmailResolver()
+    result = ImportResult()
+    created_by_id = created_by.id if created_by is not None else None
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(CREATE_STAGING_SQL)
+        for chunk in chunked(records, chunk_size):
+            resolver.resolve(
+                field.lower() for _, row in chunk for field in row[len(EXPORT_FIELDS) - 2 :]
+            )
+            buffer = StringIO()
+            writer = csv.writer(buffer)
+            for line, row in chunk:
+                try:
+                    writer.writerow(clean_row(row, resolver, created_by_id))
+                except ValueError as error:
+                    result.reject(line, str(error))
+                    if rejected_writer is not None:
+                        rejected_writer.writerow([line, *row, str(error)])
+            buffer.seek(0)
+            cursor.copy_expert(COPY_STAGING_SQL, buffer)
+            result.rows += len(chunk)
+            if progress is not None:
+                progress(result)
+
+        cursor.execute(STAGED_STATS_SQL)
+        deltas = {(status, priority): count for status, priority, count in cursor.fetchall()}
+        cursor.execute(
+            MERGE_STAGING_SQL.format(
+                task=Task._meta.db_table, outbox=TaskOutbox._meta.db_table
+            ),
+            [TaskOutbox.Kind.DEADLINE_REMINDER, Task.Status.PENDING, now() + REMINDER_WINDOW],
+        )
+        result.imported = sum(deltas.values())
+        cursor.execute("DROP TABLE task_import_staging")
+
+        apply_stats_delta(deltas)
+        transaction.on_commit(bump_task_namespaces)
+    return result
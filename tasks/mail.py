@@ -0,0 +1,128 @@
+import os
+import smtplib
+import threading
+import time
+
+from django.core.mail.backends.smtp import EmailBackend
+
+# A connection idle for longer than this is probed with NOOP before reuse.
+HEALTH_CHECK_INTERVAL = 30
+# Retire a connection after this many messages; providers cap per-session sends.
+MAX_MESSAGES_PER_CONNECTION = 100
+RECONNECT_ATTEMPTS = 1
+
+_pool = {}
+_pool_lock = threading.RLock()
+
+
+class PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.last_used = time.monotonic()
+        self.sent = 0
+
+    def healthy(self):
+        if self.sent >= MAX_MESSAGES_PER_CONNECTION:
+            return False
+        if time.monotonic() - self.last_used < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            return self.connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def quit(self):
+        try:
+            self.connection.quit()
+        except (smtplib.SMTPException, OSError):
+            self.connection.close()
+
+
+def close_pooled_connections():
+    with _pool_lock:
+        for pooled in _pool.values():
+            pooled.quit()
+        _pool.clear()
+
+
+def _reset_pool_after_fork():
+    # A forked worker must never write to its parent's sockets.
+    global _pool_lock
+    _pool.clear()
+    _pool_lock = threading.RLock()
+
+
+os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+class PooledEmailBackend(EmailBackend):
+    """
+    SMTP backend that keeps one authenticated connection per process.
+
+    The stock backend pays a TCP + STARTTLS + AUTH handshake on every
+    ``send_mail``. Here ``close()`` hands the connection back to a
+    process-wide pool and ``open()`` reuses it, probing with NOOP when it
+    has sat idle. A connection that drops mid-batch is replaced and only
+    the unsent messages are retried.
+    """
+
+    def pool_key(self):
+        return (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+
+    def open(self):
+        if self.connection:
+            return False
+        with _pool_lock:
+            pooled = _pool.get(self.pool_key())
+            if pooled is not None and pooled.healthy():
+                self.connection = pooled.connection
+                return False
+            self.discard()
+            created = super().open()
+            if self.connection is not None:
+                _pool[self.pool_key()] = PooledConnection(self.connection)
+            return created
+
+    def close(self):
+        # Keep the session open for the next send; see close_pooled_connections().
+        self.connection = None
+
+    def discard(self):
+        with _pool_lock:
+            pooled = _pool.pop(self.pool_key(), None)
+            if pooled is not None:
+                pooled.quit()
+            self.connection = None
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        remaining = list(email_messages)
+        num_sent = 0
+        with _pool_lock:
+            for attempt in range(RECONNECT_ATTEMPTS + 1):
+                try:
+                    if self.open() is None:
+                        return num_sent
+                    pooled = _pool[self.pool_key()]
+                    while remaining:
+                        if pooled.sent >= MAX_MESSAGES_PER_CONNECTION:
+                            # Retire a full session mid-batch too, not only between sends.
+                            self.discard()
+                            if self.open() is None:
+                                return num_sent
+                            pooled = _pool[self.pool_key()]
+                        if self._send(remaining[0]):
+                            num_sent += 1
+                        remaining.pop(0)
+                        pooled.sent += 1
+                        pooled.last_used = time.monotonic()
+                    break
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    self.discard()
+                    if attempt == RECONNECT_ATTEMPTS:
+                        if not self.fail_silently:
+                            raise
+                        break
+            self.close()
+        return num_sent
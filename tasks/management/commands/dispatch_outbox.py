@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from tasks.outbox import (
+    OUTBOX_BATCH_SIZE,
+    drain_outbox,
+    listen_for_outbox,
+    wait_for_outbox,
+)
+
+
+class Command(BaseCommand):
+    help = "Deliver task outbox entries to Celery and the channel layer as they are committed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait for a notification before looking for due retries",
+        )
+
+    def handle(self, *args, **options):
+        listen_for_outbox()
+        self.stdout.write(self.style.SUCCESS("Dispatching the task outbox"))
+        while True:
+            delivered = drain_outbox(options["batch_size"])
+            if delivered:
+                self.stdout.write(f"{delivered} outbox entries delivered")
+            wait_for_outbox(options["poll_interval"])
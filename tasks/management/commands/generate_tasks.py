@@ -1,45 +1,75 @@
+import os
 import random
-from concurrent.futures import ThreadPoolExecutor
-from django.core.management.base import BaseCommand
-from django.utils.timezone import now, timedelta
-from faker import Faker
-from django.contrib.auth import get_user_model
-from tasks.models import Task
-from users.models import User
-fake = Faker()
-
-def create_task_batch(users, batch_size):
-    tasks = [
-        Task(
-            title=fake.sentence(),
-            description=fake.paragraph(),
-            priority=random.choice([Task.Priority.LOW, Task.Priority.MEDIUM, Task.Priority.HIGH]),
-            due_date=now() + timedelta(days=random.randint(1, 365)),
-            status=random.choice([Task.Status.PENDING, Task.Status.IN_PROGRESS, Task.Status.COMPLETED]),
-            assigned_to=random.choice(users),
-            created_by=random.choice(users),
-        )
-        for _ in range(batch_size)
-    ]
-    Task.objects.bulk_create(tasks)
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.seeding import SEED_BATCH_SIZE, seed_tasks
+
 
 class Command(BaseCommand):
     help = "Generate random tasks"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000, help="Number of tasks to create")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes loading batches in parallel",
+        )
+        parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE)
+        parser.add_argument(
+            "--seed", type=int, help="Random seed; a fixed seed reproduces the same tasks"
+        )
+        parser.add_argument(
+            "--anchor-date",
+            help="Date (YYYY-MM-DD) the generated timestamps are relative to (default: today)",
+        )
 
     def handle(self, *args, **options):
-        total_records = 100000
-        num_threads = 4
-        
-        users = list(User.objects.all())
-        if not users:
-            print("No users found. Please create users first.")
-            return
+        rows = options["rows"]
+        if rows < 0 or options["batch_size"] <= 0:
+            raise CommandError("--rows must not be negative and --batch-size must be positive")
+        seed = options["seed"] if options["seed"] is not None else random.randrange(2**32)
+        try:
+            day = (
+                datetime.strptime(options["anchor_date"], "%Y-%m-%d").date()
+                if options["anchor_date"]
+                else datetime.now(timezone.utc).date()
+            )
+        except ValueError:
+            raise CommandError(f"Invalid --anchor-date '{options['anchor_date']}'")
+        anchor = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
 
-        batch_size = total_records // num_threads 
-        print(f"Generating {total_records} tasks using {num_threads} threads...")
+        self.stdout.write(
+            f"Generating {rows} tasks with {options['workers']} workers "
+            f"(--seed {seed} --anchor-date {day})..."
+        )
 
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = [executor.submit(create_task_batch, users, batch_size) for _ in range(num_threads)]
+        def report(inserted):
+            self.stdout.write(f"{inserted} of {rows} rows", ending="\r")
+            self.stdout.flush()
 
-        print(f"{total_records} tasks created successfully")
+        started = time.perf_counter()
+        try:
+            inserted = seed_tasks(
+                rows,
+                seed,
+                anchor,
+                workers=options["workers"],
+                batch_size=options["batch_size"],
+                progress=report,
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write("")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{inserted} tasks created in {elapsed:.1f}s "
+                f"({inserted / elapsed if elapsed else 0:,.0f} rows/sec)"
+            )
+        )
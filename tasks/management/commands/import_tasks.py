@@ -0,0 +1,67 @@
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.imports import IMPORT_CHUNK_SIZE, import_tasks_csv
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Import tasks from a CSV file in the export format"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import (.gz is decompressed, - reads stdin)")
+        parser.add_argument(
+            "--rejected",
+            help="Where to write rejected rows (default: <path>.rejected.csv)",
+        )
+        parser.add_argument(
+            "--created-by",
+            help="Email of the user to record as creator instead of the file's column",
+        )
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        created_by = None
+        if options["created_by"]:
+            created_by = User.objects.filter(email__iexact=options["created_by"]).first()
+            if created_by is None:
+                raise CommandError(f"No user with email {options['created_by']}")
+
+        rejected_path = options["rejected"] or (
+            "rejected.csv" if path == "-" else f"{path}.rejected.csv"
+        )
+        if path == "-":
+            source = sys.stdin.buffer
+        elif path.endswith(".gz"):
+            source = gzip.open(path, "rb")
+        else:
+            source = open(path, "rb")
+
+        def report(result):
+            self.stdout.write(
+                f"{result.rows} rows read, {result.rejected} rejected", ending="\r"
+            )
+            self.stdout.flush()
+
+        try:
+            with source, open(rejected_path, "w", newline="", encoding="utf-8") as rejected:
+                result = import_tasks_csv(
+                    source,
+                    created_by=created_by,
+                    rejected=rejected,
+                    progress=report,
+                    chunk_size=options["chunk_size"],
+                )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write("")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.imported} of {result.rows} rows; "
+                f"{result.rejected} rejected (see {rejected_path})"
+            )
+        )
@@ -0,0 +1,44 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+
+@database_sync_to_async
+def get_jwt_user(raw_token):
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+class JWTAuthMiddleware:
+    """
+    Authenticate WebSocket connections with the same access tokens as the API.
+
+    Browsers cannot set headers on a WebSocket handshake, so the token is read
+    from ``?token=`` as well as from an ``Authorization: Bearer`` header. A
+    valid token replaces the session user; otherwise ``scope["user"]`` is left
+    as set by the outer ``AuthMiddlewareStack``.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def __call__(self, scope, receive, send):
+        raw_token = self.get_raw_token(scope)
+        if raw_token:
+            user = await get_jwt_user(raw_token)
+            if user is not None:
+                scope = dict(scope, user=user)
+        return await self.inner(scope, receive, send)
+
+    def get_raw_token(self, scope):
+        headers = dict(scope.get("headers", []))
+        authorization = headers.get(b"authorization", b"").decode()
+        if authorization.startswith("Bearer "):
+            return authorization.split(" ", 1)[1]
+        query = parse_qs(scope.get("query_string", b"").decode())
+        return query.get("token", [None])[0]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines'), ('parquet', 'Parquet')], default='csv', max_length=10, verbose_name='Format')),
+                ('filters', models.JSONField(blank=True, default=dict, verbose_name='Filters')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=15, verbose_name='Status')),
+                ('total_rows', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Total Rows')),
+                ('exported_rows', models.PositiveBigIntegerField(default=0, verbose_name='Exported Rows')),
+                ('file', models.FileField(blank=True, upload_to='exports/', verbose_name='File')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Completed At')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+            ],
+        ),
+    ]
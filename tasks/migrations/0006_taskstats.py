@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:15
+
+from django.db import migrations, models
+
+
+def backfill_task_stats(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    TaskStats = apps.get_model("tasks", "TaskStats")
+    counts = Task.objects.values("status", "priority").annotate(count=models.Count("id"))
+    TaskStats.objects.bulk_create(
+        TaskStats(status=row["status"], priority=row["priority"], count=row["count"])
+        for row in counts.order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=15, verbose_name='Status')),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10, verbose_name='Priority')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Count')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('status', 'priority'), name='task_stats_status_priority_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_task_stats, migrations.RunPython.noop),
+    ]
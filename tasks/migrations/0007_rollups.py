@@ -0,0 +1,53 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_status_changed_at(apps, schema_editor):
+    # The closest known time for existing rows is their last update.
+    Task = apps.get_model("tasks", "Task")
+    Task.objects.update(status_changed_at=models.F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_taskstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Watermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Name')),
+                ('value', models.DateTimeField(verbose_name='Value')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='status_changed_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Status Changed At'),
+        ),
+        migrations.RunPython(backfill_status_changed_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='TaskDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=15, verbose_name='Status')),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10, verbose_name='Priority')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Count')),
+                ('assigned_to', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Assigned To')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['assigned_to', 'day'], name='task_rollup_assignee_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'assigned_to', 'status', 'priority'), name='task_rollup_bucket_uniq')],
+            },
+        ),
+    ]
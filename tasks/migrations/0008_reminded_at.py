@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='reminded_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Reminded At'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+def backfill_assignment_notified_at(apps, schema_editor):
+    # Existing tasks were mailed one by one when they were created.
+    Task = apps.get_model("tasks", "Task")
+    Task.objects.update(assignment_notified_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_reminder_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='assignment_notified_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Assignment Notified At'),
+        ),
+        migrations.RunPython(backfill_assignment_notified_at, migrations.RunPython.noop),
+    ]
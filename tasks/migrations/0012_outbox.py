@@ -0,0 +1,50 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Wakes the outbox dispatcher when the inserting transaction commits.
+NOTIFY_SQL = """
+    CREATE FUNCTION tasks_taskoutbox_notify() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('task_outbox', '');
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER tasks_taskoutbox_notify
+        AFTER INSERT ON tasks_taskoutbox
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_taskoutbox_notify();
+"""
+
+DROP_NOTIFY_SQL = """
+    DROP TRIGGER IF EXISTS tasks_taskoutbox_notify ON tasks_taskoutbox;
+    DROP FUNCTION IF EXISTS tasks_taskoutbox_notify();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_sync_changes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField(verbose_name='Task Id')),
+                ('kind', models.CharField(choices=[('broadcast', 'Broadcast'), ('assignment_email', 'Assignment Email'), ('deadline_reminder', 'Deadline Reminder')], max_length=20, verbose_name='Kind')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Payload')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Available At')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last Error')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task_id', 'id'], name='task_outbox_task_idx')],
+            },
+        ),
+        migrations.RunSQL(NOTIFY_SQL, DROP_NOTIFY_SQL),
+    ]
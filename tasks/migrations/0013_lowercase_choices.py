@@ -0,0 +1,44 @@
+from django.db import migrations, models
+from django.db.models.functions import Lower, Now
+
+
+def lowercase_choice_values(apps, schema_editor):
+    # Tasks created before input was validated could store "Pending" or
+    # "HIGH", which the exact-match list filters no longer find.
+    Task = apps.get_model("tasks", "Task")
+    TaskStats = apps.get_model("tasks", "TaskStats")
+    TaskDailyRollup = apps.get_model("tasks", "TaskDailyRollup")
+    mixed_case = ~models.Q(status=Lower("status")) | ~models.Q(priority=Lower("priority"))
+
+    Task.objects.filter(mixed_case).update(
+        status=Lower("status"), priority=Lower("priority"), updated_at=Now()
+    )
+
+    counts = Task.objects.values("status", "priority").annotate(count=models.Count("id"))
+    TaskStats.objects.all().delete()
+    TaskStats.objects.bulk_create(
+        TaskStats(status=row["status"], priority=row["priority"], count=row["count"])
+        for row in counts.order_by()
+    )
+
+    for rollup in TaskDailyRollup.objects.filter(mixed_case):
+        merged, _ = TaskDailyRollup.objects.get_or_create(
+            day=rollup.day,
+            assigned_to_id=rollup.assigned_to_id,
+            status=rollup.status.lower(),
+            priority=rollup.priority.lower(),
+        )
+        merged.count += rollup.count
+        merged.save(update_fields=["count"])
+        rollup.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_outbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_choice_values, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,13 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+SEARCH_CONFIG = "english"
+
 
 class Task(models.Model):
     class Priority(models.TextChoices):
@@ -28,6 +34,8 @@ class Task(models.Model):
         on_delete=models.CASCADE,
         related_name="tasks",
         verbose_name=_("Assigned To"),
+        # Covered by the leading column of task_assignee_status_idx.
+        db_index=False,
     )
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -37,6 +45,176 @@ class Task(models.Model):
     )
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+    status_changed_at = models.DateTimeField(
+        _("Status Changed At"), default=timezone.now, db_index=True
+    )
+    # Set once a deadline reminder has gone out; cleared when due_date moves.
+    reminded_at = models.DateTimeField(_("Reminded At"), null=True, blank=True)
+    # Set once the assignee has been mailed about this task.
+    assignment_notified_at = models.DateTimeField(
+        _("Assignment Notified At"), null=True, blank=True
+    )
+    # Maintained by PostgreSQL on every INSERT/UPDATE; never written by Django.
+    search_vector = models.GeneratedField(
+        expression=SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="B", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="task_created_at_id_idx"),
+            # Keyset for /api/tasks/changes/.
+            models.Index(fields=["updated_at", "id"], name="task_updated_at_id_idx"),
+            models.Index(fields=["due_date", "id"], name="task_due_date_id_idx"),
+            models.Index(fields=["assigned_to", "status"], name="task_assignee_status_idx"),
+            models.Index(fields=["status", "created_at", "id"], name="task_status_created_idx"),
+            models.Index(fields=["status", "due_date"], name="task_status_due_idx"),
+            models.Index(
+                fields=["priority", "created_at", "id"], name="task_priority_created_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="task_search_vector_idx"),
+            # Serves both the fuzzy title fallback and UPPER(title) LIKE from icontains.
+            GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="task_title_trgm_idx"),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class TaskTombstone(models.Model):
+    """Id of a deleted task, kept for ``TOMBSTONE_RETENTION`` so syncing clients see the delete."""
+
+    task_id = models.BigIntegerField(_("Task Id"))
+    deleted_at = models.DateTimeField(_("Deleted At"), default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["deleted_at", "id"], name="task_tombstone_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"task #{self.task_id} deleted at {self.deleted_at}"
+
+
+class TaskOutbox(models.Model):
+    """A side effect of a task write, committed with it and delivered by ``drain_outbox``."""
+
+    class Kind(models.TextChoices):
+        BROADCAST = "broadcast", _("Broadcast")
+        ASSIGNMENT_EMAIL = "assignment_email", _("Assignment Email")
+        DEADLINE_REMINDER = "deadline_reminder", _("Deadline Reminder")
+
+    task_id = models.BigIntegerField(_("Task Id"))
+    kind = models.CharField(_("Kind"), max_length=20, choices=Kind.choices)
+    payload = models.JSONField(_("Payload"), default=dict, blank=True)
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+    # Pushed back after a failed delivery; the task's later entries wait behind it.
+    available_at = models.DateTimeField(_("Available At"), default=timezone.now)
+    attempts = models.PositiveIntegerField(_("Attempts"), default=0)
+    last_error = models.TextField(_("Last Error"), blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["task_id", "id"], name="task_outbox_task_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} for task #{self.task_id}"
+
+
+class ExportJob(models.Model):
+    class Format(models.TextChoices):
+        CSV = "csv", _("CSV")
+        JSONL = "jsonl", _("JSON Lines")
+        PARQUET = "parquet", _("Parquet")
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        RUNNING = "running", _("Running")
+        COMPLETED = "completed", _("Completed")
+        FAILED = "failed", _("Failed")
+
+    format = models.CharField(
+        _("Format"), max_length=10, choices=Format.choices, default=Format.CSV
+    )
+    filters = models.JSONField(_("Filters"), default=dict, blank=True)
+    status = models.CharField(
+        _("Status"), max_length=15, choices=Status.choices, default=Status.PENDING
+    )
+    total_rows = models.PositiveBigIntegerField(_("Total Rows"), null=True, blank=True)
+    exported_rows = models.PositiveBigIntegerField(_("Exported Rows"), default=0)
+    file = models.FileField(_("File"), upload_to="exports/", blank=True)
+    error = models.TextField(_("Error"), blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="export_jobs",
+        verbose_name=_("Created By"),
+    )
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+    completed_at = models.DateTimeField(_("Completed At"), null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.format} export #{self.pk}"
+
+
+class TaskStats(models.Model):
+    """Running task count per (status, priority), kept current on every write."""
+
+    status = models.CharField(_("Status"), max_length=15, choices=Task.Status.choices)
+    priority = models.CharField(_("Priority"), max_length=10, choices=Task.Priority.choices)
+    count = models.BigIntegerField(_("Count"), default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["status", "priority"], name="task_stats_status_priority_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.status}/{self.priority}: {self.count}"
+
+
+class Watermark(models.Model):
+    """High-water mark of an incremental background job, keyed by job name."""
+
+    name = models.CharField(_("Name"), max_length=100, unique=True)
+    value = models.DateTimeField(_("Value"))
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
+class TaskDailyRollup(models.Model):
+    """Tasks that entered ``status`` on ``day``, per assignee and priority."""
+
+    day = models.DateField(_("Day"))
+    assigned_to = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="task_rollups",
+        verbose_name=_("Assigned To"),
+        # Covered by the leading column of task_rollup_assignee_day_idx.
+        db_index=False,
+    )
+    status = models.CharField(_("Status"), max_length=15, choices=Task.Status.choices)
+    priority = models.CharField(_("Priority"), max_length=10, choices=Task.Priority.choices)
+    count = models.BigIntegerField(_("Count"), default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "assigned_to", "status", "priority"],
+                name="task_rollup_bucket_uniq",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["assigned_to", "day"], name="task_rollup_assignee_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}/{self.priority}: {self.count}"
@@ -0,0 +1,217 @@
+import select
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils.timezone import now
+
+from .broadcast import asend_to_audiences, task_audience, task_event
+from .models import Task, TaskOutbox
+from .tasks import queue_assignment_emails, schedule_deadline_reminders
+
+OUTBOX_BATCH_SIZE = 200
+OUTBOX_INSERT_BATCH_SIZE = 1000
+OUTBOX_CHANNEL = "task_outbox"
+# Held for each batch so entries are delivered by one dispatcher at a time.
+OUTBOX_LOCK_ID = 0x7461736B
+OUTBOX_RETRY_DELAY = timedelta(seconds=5)
+OUTBOX_MAX_RETRY_DELAY = timedelta(minutes=10)
+
+
+def record_task_created(task, data):
+    """Queue the assignment mail, deadline reminder and broadcast of a new task."""
+    TaskOutbox.objects.bulk_create(created_entries(task, data))
+
+
+def record_task_updated(task, data, changed, rescheduled):
+    """Queue the broadcast of an update, and a reminder if ``rescheduled``."""
+    TaskOutbox.objects.bulk_create(updated_entries(task, data, changed, rescheduled))
+
+
+def record_bulk_written(result):
+    """
+    Queue the side effects of a bulk write, in one INSERT for the batch.
+
+    Entries are written kind by kind, which keeps each task's in the order
+    ``record_task_created`` and ``record_task_updated`` use while letting
+    the dispatcher deliver every kind of the batch in one go.
+    """
+    rescheduled = {task.id for task in result.rescheduled}
+    entries = []
+    for task, data in zip(result.created, result.created_data):
+        entries += created_entries(task, data)
+    for task, data in zip(result.updated, result.updated_data):
+        entries += updated_entries(task, data, result.changed[task.id], task.id in rescheduled)
+    for task_id, audience in result.deleted_audience.items():
+        entries.append(
+            TaskOutbox(
+                task_id=task_id,
+                kind=TaskOutbox.Kind.BROADCAST,
+                payload={"audience": sorted(audience), "event": {"op": "deleted", "id": task_id}},
+            )
+        )
+    order = [
+        TaskOutbox.Kind.ASSIGNMENT_EMAIL,
+        TaskOutbox.Kind.DEADLINE_REMINDER,
+        TaskOutbox.Kind.BROADCAST,
+    ]
+    entries.sort(key=lambda entry: order.index(entry.kind))
+    TaskOutbox.objects.bulk_create(entries, batch_size=OUTBOX_INSERT_BATCH_SIZE)
+
+
+def created_entries(task, data):
+    entries = [
+        TaskOutbox(
+            task_id=task.id,
+            kind=TaskOutbox.Kind.ASSIGNMENT_EMAIL,
+            payload={"user_id": task.assigned_to_id},
+        )
+    ]
+    if task.due_date:
+        entries.append(TaskOutbox(task_id=task.id, kind=TaskOutbox.Kind.DEADLINE_REMINDER))
+    entries.append(broadcast_entry(task, task_event("created", data)))
+    return entries
+
+
+def updated_entries(task, data, changed, rescheduled):
+    entries = []
+    if rescheduled:
+        entries.append(TaskOutbox(task_id=task.id, kind=TaskOutbox.Kind.DEADLINE_REMINDER))
+    entries.append(broadcast_entry(task, task_event("updated", data, changed)))
+    return entries
+
+
+def broadcast_entry(task, event):
+    return TaskOutbox(
+        task_id=task.id,
+        kind=TaskOutbox.Kind.BROADCAST,
+        payload={"audience": sorted(task_audience(task)), "event": event},
+    )
+
+
+def drain_outbox(batch_size=OUTBOX_BATCH_SIZE):
+    """Deliver every entry that is due and return how many were delivered."""
+    delivered = 0
+    while True:
+        count, more = dispatch_batch(batch_size)
+        delivered += count
+        if not more:
+            return delivered
+
+
+def dispatch_batch(batch_size):
+    """
+    Deliver up to ``batch_size`` due entries in id order.
+
+    An entry that fails is retried with exponential backoff, and no entry is
+    picked while an earlier one of its task awaits a retry, so each task's
+    side effects go out in the order they were written, including ones
+    written after the failure. Entries of one kind are delivered together,
+    so a batch's broadcasts share one channel-layer message per user and a
+    bulk write's mails and reminders one call each, but a task's pending
+    entries are flushed before its next entry of another kind, which is
+    skipped if they fail. Entries are deleted in the transaction that
+    delivered them, so a dispatcher dying mid-batch can deliver an entry
+    twice but never drops one; the Celery tasks involved are idempotent and
+    websocket clients merge repeated updates. Returns ``(delivered, more)``.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [OUTBOX_LOCK_ID])
+            (locked,) = cursor.fetchone()
+        if not locked:
+            return 0, False
+
+        # Due entries of a task come out in id order within the batch, so
+        # only an earlier one still waiting for its retry holds a task back.
+        moment = now()
+        held_back = TaskOutbox.objects.filter(
+            task_id=OuterRef("task_id"), id__lt=OuterRef("id"), available_at__gt=moment
+        )
+        due = TaskOutbox.objects.filter(~Exists(held_back), available_at__lte=moment)
+        entries = list(due.order_by("id")[:batch_size])
+        # Entries waiting to be delivered by kind, and the kind each task waits on.
+        delivered, blocked, pending, pending_kind = [], set(), {}, {}
+
+        def flush():
+            for kind, group in pending.items():
+                try:
+                    deliver(kind, group)
+                except Exception as error:
+                    for entry in group:
+                        retry_later(entry, error)
+                        blocked.add(entry.task_id)
+                else:
+                    delivered.extend(entry.id for entry in group)
+            pending.clear()
+            pending_kind.clear()
+
+        for entry in entries:
+            if entry.task_id in blocked:
+                continue
+            if pending_kind.get(entry.task_id, entry.kind) != entry.kind:
+                flush()
+                if entry.task_id in blocked:
+                    continue
+            pending.setdefault(entry.kind, []).append(entry)
+            pending_kind[entry.task_id] = entry.kind
+        flush()
+
+        TaskOutbox.objects.filter(id__in=delivered).delete()
+    return len(delivered), len(entries) == batch_size
+
+
+def deliver(kind, entries):
+    if kind == TaskOutbox.Kind.BROADCAST:
+        send_broadcasts(entries)
+    elif kind == TaskOutbox.Kind.ASSIGNMENT_EMAIL:
+        queue_assignment_emails(entry.payload["user_id"] for entry in entries)
+    elif kind == TaskOutbox.Kind.DEADLINE_REMINDER:
+        # Reminders follow the tasks as they are now; deleted tasks need none.
+        schedule_deadline_reminders(
+            Task.objects.filter(id__in=[entry.task_id for entry in entries]).only(
+                "status", "due_date", "assigned_to_id"
+            )
+        )
+    else:
+        raise ValueError(f"Unknown outbox entry kind '{kind}'")
+
+
+def send_broadcasts(entries):
+    audiences = {}
+    for entry in entries:
+        for user_id in entry.payload["audience"]:
+            audiences.setdefault(user_id, []).append(entry.payload["event"])
+    async_to_sync(asend_to_audiences)(audiences)
+
+
+def retry_later(entry, error):
+    entry.attempts += 1
+    delay = min(OUTBOX_RETRY_DELAY * 2 ** min(entry.attempts - 1, 16), OUTBOX_MAX_RETRY_DELAY)
+    entry.available_at = now() + delay
+    entry.last_error = str(error)
+    entry.save(update_fields=["attempts", "available_at", "last_error"])
+
+
+_listening = None
+
+
+def listen_for_outbox():
+    """LISTEN for outbox inserts, again whenever Django has reconnected since."""
+    global _listening
+    connection.ensure_connection()
+    if _listening is connection.connection:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {OUTBOX_CHANNEL}")
+    _listening = connection.connection
+
+
+def wait_for_outbox(timeout):
+    """Block until an outbox insert is committed or ``timeout`` seconds pass."""
+    listen_for_outbox()
+    raw = connection.connection
+    if select.select([raw], [], [], timeout)[0]:
+        raw.poll()
+        raw.notifies.clear()
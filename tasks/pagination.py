@@ -0,0 +1,188 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def task_paginator(request):
+    # Keyset pagination is opt-in: ?pagination=cursor, or any request carrying a cursor.
+    params = request.query_params
+    if params.get("pagination") == "cursor" or "cursor" in params:
+        return TaskCursorPagination()
+    return TaskPageNumberPagination()
+
+
+class TaskPageNumberPagination(PageNumberPagination):
+    """``PageNumberPagination`` that can also count and fetch with the async ORM."""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            )
+        self.page.object_list = [task async for task in self.page.object_list]
+        return list(self.page)
+
+
+class TaskCursorPagination(BasePagination):
+    """
+    Keyset pagination over ``(<ordering field>, id)``.
+
+    Unlike ``PageNumberPagination`` this never runs a ``COUNT(*)`` and never
+    uses ``OFFSET``: every page is a range seek on an indexed column pair, so
+    page 10,000 costs the same as page 1. Cursors are opaque base64 tokens.
+    Tasks without a ``due_date`` sort as if due later than every dated task.
+    """
+
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    page_size_query_param = "page_size"
+    ordering_fields = ("created_at", "due_date")
+    nullable_fields = ("due_date",)
+    default_ordering = "-created_at"
+    page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE") or 10
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor, forward, queryset = self.seek_queryset(queryset, request)
+        return self.set_page(list(queryset), cursor, forward)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        cursor, forward, queryset = self.seek_queryset(queryset, request)
+        return self.set_page([task async for task in queryset], cursor, forward)
+
+    def seek_queryset(self, queryset, request):
+        """Return the decoded cursor, its direction and the page query (one row extra)."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+        self.field = self.ordering.lstrip("-")
+        self.descending = self.ordering.startswith("-")
+
+        cursor = self.decode_cursor(request)
+        forward = cursor is None or not cursor["r"]
+        if cursor is not None:
+            queryset = queryset.filter(self.seek(cursor["v"], cursor["id"], forward))
+        queryset = queryset.order_by(*self.get_order_by(forward))
+        return cursor, forward, queryset[: self.page_size + 1]
+
+    def set_page(self, results, cursor, forward):
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if not forward:
+            results.reverse()
+
+        if forward:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        else:
+            self.has_next = True
+            self.has_previous = has_more
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param, self.default_ordering)
+        if ordering.lstrip("-") not in self.ordering_fields:
+            return self.default_ordering
+        return ordering
+
+    def get_order_by(self, forward):
+        # Backward pages are fetched in inverse order and reversed afterwards.
+        if self.descending == forward:
+            return (F(self.field).desc(), F("id").desc())
+        return (F(self.field).asc(), F("id").asc())
+
+    def seek(self, value, pk, forward):
+        """
+        Rows strictly after (``forward``) or before the ``(value, pk)`` position.
+
+        NULLs compare as larger than any value, matching PostgreSQL's default
+        B-tree ordering so both directions remain plain index range scans.
+        """
+        op = "gt" if self.descending != forward else "lt"
+        tie = Q(**{f"id__{op}": pk})
+        if self.field not in self.nullable_fields:
+            return Q(**{f"{self.field}__{op}": value}) | Q(**{self.field: value}) & tie
+        is_null = Q(**{f"{self.field}__isnull": True})
+        if value is None:
+            return is_null & tie if op == "gt" else ~is_null | is_null & tie
+        seek = Q(**{f"{self.field}__{op}": value}) | Q(**{self.field: value}) & tie
+        return seek | is_null if op == "gt" else seek
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, task, reverse):
+        value = getattr(task, self.field)
+        payload = {
+            "o": self.ordering,
+            "v": value.isoformat() if value is not None else None,
+            "id": task.pk,
+            "r": reverse,
+        }
+        token = urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode())
+        url = remove_query_param(self.base_url, "page")
+        return replace_query_param(url, self.cursor_query_param, token.decode())
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(urlsafe_b64decode(token.encode()))
+            value = payload["v"]
+            if value is not None:
+                value = parse_datetime(value)
+                if value is None:
+                    raise ValueError
+            cursor = {"v": value, "id": int(payload["id"]), "r": bool(payload["r"])}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if payload.get("o") != self.ordering:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
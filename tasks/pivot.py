@@ -0,0 +1,135 @@
+from datetime import date, timedelta
+from itertools import chain
+
+import numpy as np
+from django.db.models import Case, DateField, F, Func, IntegerField, Value, When
+from django.db.models.functions import Coalesce, TruncWeek
+
+from users.models import User
+from .filters import filter_tasks
+from .models import Task
+
+PIVOT_CHUNK_SIZE = 20000
+DEFAULT_PIVOT_DIMENSIONS = ("status", "priority")
+PIVOT_DIMENSIONS = ("status", "priority", "assigned_to", "due_week")
+MISSING_LABEL = "none"
+MISSING_CODE = -1
+EPOCH_DATE = date(1970, 1, 1)
+
+
+class DaysSinceEpoch(Func):
+    template = "((%(expressions)s)::date - DATE '1970-01-01')"
+    output_field = IntegerField()
+
+
+def choice_code(field, values):
+    return Case(
+        *(When(**{field: value}, then=Value(code)) for code, value in enumerate(values)),
+        default=Value(MISSING_CODE),
+        output_field=IntegerField(),
+    )
+
+
+def dimension_expression(dim):
+    """
+    Integer key for ``dim``, computed by PostgreSQL.
+
+    Every column comes back as a plain integer, so rows need no per-value
+    conversion in Python and each chunk loads straight into a NumPy array.
+    """
+    if dim == "status":
+        return choice_code("status", Task.Status.values)
+    if dim == "priority":
+        return choice_code("priority", Task.Priority.values)
+    if dim == "assigned_to":
+        return F("assigned_to_id")
+    week = TruncWeek("due_date", output_field=DateField())
+    return Coalesce(DaysSinceEpoch(week), Value(MISSING_CODE))
+
+
+def parse_dimensions(value):
+    if not value:
+        return DEFAULT_PIVOT_DIMENSIONS
+    dims = tuple(dim.strip() for dim in value.split(",") if dim.strip())
+    unknown = [dim for dim in dims if dim not in PIVOT_DIMENSIONS]
+    if unknown:
+        raise ValueError(
+            f"Invalid dimension '{unknown[0]}', expected one of: {', '.join(PIVOT_DIMENSIONS)}"
+        )
+    if len(set(dims)) != len(dims):
+        raise ValueError("Dimensions must not repeat")
+    return dims
+
+
+def pivot_keys(params, dims):
+    """
+    Read the integer key of every dimension as one ``(rows, dims)`` array.
+
+    Rows stream from a server-side cursor in chunks of ``PIVOT_CHUNK_SIZE``
+    and are flattened straight into the array, so no per-row Python objects
+    outlive the chunk they came in.
+    """
+    columns = {f"pivot_{dim}": dimension_expression(dim) for dim in dims}
+    rows = (
+        filter_tasks(Task.objects.all(), params)
+        .order_by()
+        .annotate(**columns)
+        .values_list(*columns)
+        .iterator(chunk_size=PIVOT_CHUNK_SIZE)
+    )
+    keys = np.fromiter(chain.from_iterable(rows), dtype=np.int64)
+    return keys.reshape(-1, len(dims))
+
+
+def labels_for(dim, keys):
+    """Label of each key in ``keys``; ``MISSING_CODE`` becomes ``None``."""
+    keys = keys.tolist()
+    if dim == "status":
+        labels = dict(enumerate(Task.Status.values))
+    elif dim == "priority":
+        labels = dict(enumerate(Task.Priority.values))
+    elif dim == "assigned_to":
+        labels = dict(User.objects.filter(id__in=keys).values_list("id", "email"))
+    else:
+        return [
+            (EPOCH_DATE + timedelta(days=key)).isoformat() if key != MISSING_CODE else None
+            for key in keys
+        ]
+    return [None if key == MISSING_CODE else labels.get(key) for key in keys]
+
+
+def compute_pivot(params, dims):
+    """
+    Count tasks matching ``params`` across every combination of ``dims``.
+
+    Each key column is factorized with ``np.unique`` and the resulting codes
+    are folded into one mixed-radix index. Counting those indexes with
+    ``np.unique`` yields only the cells that occur, so memory follows the
+    number of rows rather than the product of the dimension sizes.
+    """
+    keys = pivot_keys(params, dims)
+    categories, codes = [], []
+    for i in range(len(dims)):
+        values, inverse = np.unique(keys[:, i], return_inverse=True)
+        categories.append(values)
+        codes.append(inverse.ravel())
+
+    shape = tuple(max(len(values), 1) for values in categories)
+    cells, counts = np.unique(np.ravel_multi_index(codes, shape), return_counts=True)
+    cell_codes = np.unravel_index(cells, shape)
+
+    labels = [
+        [MISSING_LABEL if label is None else label for label in labels_for(dim, values)]
+        for dim, values in zip(dims, categories)
+    ]
+    data = {}
+    for *path, count in zip(*(code.tolist() for code in cell_codes), counts.tolist()):
+        node = data
+        for labels_of_dim, code in zip(labels[:-1], path[:-1]):
+            node = node.setdefault(labels_of_dim[code], {})
+        node[labels[-1][path[-1]]] = count
+    return {
+        "dimensions": list(dims),
+        "total": int(counts.sum()),
+        "data": data,
+    }
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils.timezone import localtime, now
+
+from .models import Task, Watermark
+
+REMINDER_WATERMARK = "deadline_reminders"
+REMINDER_WINDOW = timedelta(hours=24)
+REMINDER_CHUNK_SIZE = 200
+
+
+def claim_reminder_window(enqueue):
+    """
+    Claim the due dates that entered the reminder horizon since the last run.
+
+    The watermark holds the horizon (``now + REMINDER_WINDOW``) reached by the
+    previous sweep, so each run reads only the ``(watermark, horizon]`` slice
+    of the ``(status, due_date)`` index and its cost follows the number of
+    newly due tasks rather than the size of the backlog. A fresh watermark
+    starts at the current time, so long-overdue tasks are never swept.
+
+    Task id chunks that never split an assignee are passed to ``enqueue``
+    inside the transaction that advances the watermark, so a broker failure
+    rolls it back and the next run claims the same window again; chunks that
+    were already queued are deduplicated by ``reminded_at``. Returns the
+    number of chunks queued.
+    """
+    horizon = now() + REMINDER_WINDOW
+    with transaction.atomic():
+        Watermark.objects.get_or_create(name=REMINDER_WATERMARK, defaults={"value": now()})
+        watermark = Watermark.objects.select_for_update().get(name=REMINDER_WATERMARK)
+        if watermark.value >= horizon:
+            return 0
+
+        rows = (
+            Task.objects.filter(
+                status=Task.Status.PENDING,
+                due_date__gt=watermark.value,
+                due_date__lte=horizon,
+                reminded_at__isnull=True,
+            )
+            .order_by("assigned_to_id", "id")
+            .values_list("assigned_to_id", "id")
+        )
+        chunks = list(reminder_chunks(rows))
+        for chunk in chunks:
+            enqueue(chunk)
+
+        watermark.value = horizon
+        watermark.save(update_fields=["value", "updated_at"])
+    return len(chunks)
+
+
+def reminder_chunks(rows, size=REMINDER_CHUNK_SIZE):
+    chunk, last_assignee = [], None
+    for assignee_id, task_id in rows:
+        if len(chunk) >= size and assignee_id != last_assignee:
+            yield chunk
+            chunk = []
+        chunk.append(task_id)
+        last_assignee = assignee_id
+    if chunk:
+        yield chunk
+
+
+def reminder_digest(tasks):
+    lines = ["The following tasks are due soon:", ""]
+    for task in tasks:
+        lines.append(f"- {task.title} (due {localtime(task.due_date):%Y-%m-%d %H:%M})")
+    return "\n".join(lines)
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.db.models.functions import Lower, TruncDay, TruncMonth, TruncWeek
+from django.utils.timezone import localdate
+
+from .models import Task, TaskDailyRollup, Watermark
+from .sync import sync_horizon
+
+ROLLUP_WATERMARK = "task_daily_rollup"
+# A fresh watermark starts here, so the first run backfills all history.
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+ROLLUP_BUCKETS = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+MAX_ROLLUP_DAYS = 3660
+
+UPSERT_ROLLUPS_SQL = """
+    INSERT INTO {rollup} (day, assigned_to_id, status, priority, count)
+    SELECT (status_changed_at AT TIME ZONE %s)::date, assigned_to_id, status, priority, COUNT(*)
+    FROM {task}
+    WHERE status_changed_at > %s AND status_changed_at <= %s
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (day, assigned_to_id, status, priority)
+    DO UPDATE SET count = {rollup}.count + EXCLUDED.count
+"""
+
+
+def refresh_task_rollups():
+    """
+    Fold status changes since the last run into ``TaskDailyRollup``.
+
+    Only the ``(watermark, horizon]`` slice of the ``status_changed_at``
+    index is read, where the horizon is the start of the oldest open
+    transaction, so a change committed after a run can never carry a
+    timestamp inside a window already folded. The upsert and the new
+    watermark commit together, so each change is counted exactly once.
+    Returns the buckets touched.
+    """
+    upper = sync_horizon()
+    with transaction.atomic():
+        Watermark.objects.get_or_create(name=ROLLUP_WATERMARK, defaults={"value": EPOCH})
+        watermark = Watermark.objects.select_for_update().get(name=ROLLUP_WATERMARK)
+        if watermark.value >= upper:
+            return 0
+
+        sql = UPSERT_ROLLUPS_SQL.format(
+            rollup=TaskDailyRollup._meta.db_table, task=Task._meta.db_table
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [settings.TIME_ZONE, watermark.value, upper])
+            touched = cursor.rowcount
+
+        watermark.value = upper
+        watermark.save(update_fields=["value", "updated_at"])
+    return touched
+
+
+def rollup_series(params):
+    """Bucketed status-change counts per assignee, served from the rollup table."""
+    bucket = params.get("bucket", "day")
+    if bucket not in ROLLUP_BUCKETS:
+        raise ValueError(f"Invalid bucket '{bucket}', expected day, week or month")
+    days = min(int(params.get("days", 90)), MAX_ROLLUP_DAYS)
+    since = localdate() - timedelta(days=days - 1)
+
+    rollups = TaskDailyRollup.objects.filter(day__gte=since)
+    if params.get("status"):
+        rollups = rollups.filter(status=params["status"].lower())
+    if params.get("priority"):
+        rollups = rollups.filter(priority=params["priority"].lower())
+    if params.get("assigned_to"):
+        rollups = rollups.alias(assignee_email=Lower("assigned_to__email")).filter(
+            assignee_email=params["assigned_to"].lower()
+        )
+
+    rows = (
+        rollups.annotate(period=ROLLUP_BUCKETS[bucket]("day"))
+        .values("period", "assigned_to__email", "status")
+        .annotate(count=Sum("count"))
+        .order_by("period", "assigned_to__email", "status")
+    )
+    return {
+        "bucket": bucket,
+        "since": since,
+        "results": [
+            {
+                "period": row["period"],
+                "assigned_to": row["assigned_to__email"],
+                "status": row["status"],
+                "count": row["count"],
+            }
+            for row in rows
+        ],
+    }
@@ -0,0 +1,212 @@
+import csv
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta, timezone
+from io import StringIO
+from itertools import repeat
+
+import numpy as np
+from django.db import connection, connections, transaction
+from faker import Faker
+
+from users.models import User
+from .cache import bump_task_namespaces
+from .models import Task
+from .stats import apply_stats_delta
+
+SEED_BATCH_SIZE = 10000
+TITLE_CORPUS_SIZE = 5000
+DESCRIPTION_CORPUS_SIZE = 2000
+CREATED_AT_RANGE = timedelta(days=365)
+DUE_DATE_RANGE = timedelta(days=365)
+SECOND = timedelta(seconds=1)
+PRIORITIES = Task.Priority.values
+STATUSES = Task.Status.values
+
+# Taking SHARE ROW EXCLUSIVE makes concurrent inserts wait, so the reserved
+# ids form one contiguous block.
+RESERVE_IDS_SQL = """
+    SELECT setval(pg_get_serial_sequence(%(table)s, 'id'),
+                  nextval(pg_get_serial_sequence(%(table)s, 'id')) + %(rows)s - 1)
+"""
+# Seeded tasks count as already notified so a load test does not mail everyone.
+COPY_TASKS_SQL = """
+    COPY {task} (
+        id, title, description, priority, due_date, status, assigned_to_id, created_by_id,
+        created_at, updated_at, status_changed_at, assignment_notified_at
+    )
+    FROM STDIN WITH (FORMAT csv)
+"""
+
+
+class SeedPlan:
+    """Everything a worker needs to generate any batch of a seeding run."""
+
+    def __init__(self, rows, batch_size, seed, anchor, first_id, user_ids):
+        self.rows = rows
+        self.batch_size = batch_size
+        self.seed = seed
+        # Whole seconds, so the generated timestamps are exact.
+        self.anchor = np.datetime64(anchor.astimezone(timezone.utc).replace(tzinfo=None), "s")
+        self.first_id = first_id
+        self.user_ids = np.array(user_ids, dtype=np.int64)
+        self.titles, self.descriptions = build_corpus(seed)
+
+    @property
+    def batches(self):
+        return math.ceil(self.rows / self.batch_size)
+
+
+def build_corpus(seed):
+    """Fake titles and descriptions drawn once per run instead of once per row."""
+    fake = Faker()
+    fake.seed_instance(seed)
+    titles = np.array([fake.sentence() for _ in range(TITLE_CORPUS_SIZE)], dtype=object)
+    descriptions = np.array(
+        [fake.paragraph() for _ in range(DESCRIPTION_CORPUS_SIZE)], dtype=object
+    )
+    return titles, descriptions
+
+
+def reserve_task_ids(rows):
+    """Claim ``rows`` consecutive task ids and return the first one."""
+    table = Task._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute(RESERVE_IDS_SQL, {"table": table, "rows": rows})
+        (last_id,) = cursor.fetchone()
+    return last_id - rows + 1
+
+
+def seconds(values):
+    return values.astype("timedelta64[s]")
+
+
+def timestamps(values):
+    return np.datetime_as_string(values, unit="s", timezone="UTC")
+
+
+def generate_batch(plan, index, loaded_at):
+    """
+    Return batch ``index`` as a CSV buffer for ``COPY`` and its stats deltas.
+
+    Every batch draws from its own generator seeded with ``(seed, index)``,
+    so its rows do not depend on which worker runs it or in what order.
+    Only ``created_at`` is backdated: ``updated_at`` and
+    ``status_changed_at`` are ``loaded_at``, the start of the loading
+    transaction, so sync tokens and the rollup watermark, which only move
+    up to the oldest open transaction, still pick the rows up.
+    """
+    start = index * plan.batch_size
+    size = min(plan.batch_size, plan.rows - start)
+    rng = np.random.default_rng([plan.seed, index])
+
+    titles = plan.titles[rng.integers(len(plan.titles), size=size)]
+    descriptions = plan.descriptions[rng.integers(len(plan.descriptions), size=size)]
+    priorities = rng.integers(len(PRIORITIES), size=size)
+    statuses = rng.integers(len(STATUSES), size=size)
+    assignees = plan.user_ids[rng.integers(len(plan.user_ids), size=size)]
+    creators = plan.user_ids[rng.integers(len(plan.user_ids), size=size)]
+    created_at = plan.anchor - seconds(rng.integers(CREATED_AT_RANGE // SECOND, size=size))
+    due_dates = plan.anchor + seconds(
+        rng.integers(timedelta(days=1) // SECOND, DUE_DATE_RANGE // SECOND, size=size)
+    )
+
+    loaded_at = loaded_at.isoformat()
+    buffer = StringIO()
+    csv.writer(buffer).writerows(
+        zip(
+            range(plan.first_id + start, plan.first_id + start + size),
+            titles,
+            descriptions,
+            (PRIORITIES[code] for code in priorities),
+            timestamps(due_dates),
+            (STATUSES[code] for code in statuses),
+            assignees,
+            creators,
+            timestamps(created_at),
+            repeat(loaded_at),
+            repeat(loaded_at),
+            repeat(loaded_at),
+        )
+    )
+    buffer.seek(0)
+
+    counts = np.bincount(
+        statuses * len(PRIORITIES) + priorities, minlength=len(STATUSES) * len(PRIORITIES)
+    )
+    deltas = {
+        (status, priority): int(counts[s * len(PRIORITIES) + p])
+        for s, status in enumerate(STATUSES)
+        for p, priority in enumerate(PRIORITIES)
+    }
+    return buffer, deltas
+
+
+_plan = None
+
+
+def init_seed_worker(plan):
+    global _plan
+    _plan = plan
+
+
+def seed_batch(index):
+    """Load batch ``index`` of the current plan in one transaction; return its row count."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT now()")
+        (loaded_at,) = cursor.fetchone()
+        buffer, deltas = generate_batch(_plan, index, loaded_at)
+        cursor.copy_expert(COPY_TASKS_SQL.format(task=Task._meta.db_table), buffer)
+        # COPY sends no signals, so the summary counts move with each batch.
+        apply_stats_delta(deltas)
+    return sum(deltas.values())
+
+
+def seed_tasks(rows, seed, anchor, workers=1, batch_size=SEED_BATCH_SIZE, progress=None):
+    """
+    Insert ``rows`` fake tasks spread over the existing users.
+
+    Text comes from a corpus built once from ``seed``, and the rest of each
+    row from NumPy draws, so the same ``seed``, ``anchor``, users and
+    starting id sequence reproduce the same tasks exactly, whatever the
+    number of ``workers``; only the load-time stamps differ between runs.
+    Batches of ``batch_size`` rows are streamed with ``COPY`` from a pool
+    of forked processes, each on its own connection. ``progress`` is
+    called with the running row count after each batch.
+    """
+    user_ids = list(User.objects.order_by("id").values_list("id", flat=True))
+    if not user_ids:
+        raise ValueError("No users found. Please create users first.")
+    if rows <= 0:
+        return 0
+
+    plan = SeedPlan(rows, batch_size, seed, anchor, reserve_task_ids(rows), user_ids)
+    inserted = 0
+    if workers <= 1:
+        init_seed_worker(plan)
+        for index in range(plan.batches):
+            inserted += seed_batch(index)
+            if progress is not None:
+                progress(inserted)
+    else:
+        # Forked workers must not inherit the parent's open connection.
+        connections.close_all()
+        executor = ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=init_seed_worker,
+            initargs=(plan,),
+        )
+        try:
+            futures = [executor.submit(seed_batch, index) for index in range(plan.batches)]
+            for future in as_completed(futures):
+                inserted += future.result()
+                if progress is not None:
+                    progress(inserted)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    transaction.on_commit(bump_task_namespaces)
+    return inserted
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Task
+from .models import ExportJob, Task
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -7,5 +7,41 @@ class TaskSerializer(serializers.ModelSerializer):
     assigned_to = serializers.EmailField(source='assigned_to.email', read_only=True)
     class Meta:
         model = Task
-        fields = "__all__"
-        read_only_fields = ["id", "created_by", "created_at", "updated_at", "created_by", "assigned_to"]
+        exclude = ["search_vector", "reminded_at", "assignment_notified_at"]
+        read_only_fields = ["id", "created_by", "created_at", "updated_at", "created_by", "assigned_to", "status_changed_at"]
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id",
+            "format",
+            "filters",
+            "status",
+            "total_rows",
+            "exported_rows",
+            "progress",
+            "download_url",
+            "error",
+            "created_at",
+            "completed_at",
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, job):
+        if job.status == ExportJob.Status.COMPLETED:
+            return 100
+        if not job.total_rows:
+            return 0
+        return round(job.exported_rows * 100 / job.total_rows)
+
+    def get_download_url(self, job):
+        if job.status != ExportJob.Status.COMPLETED:
+            return None
+        url = f"/api/tasks/export-jobs/{job.id}/download/"
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from .cache import bump_task_namespaces
+from .models import Task, TaskTombstone
+from .stats import apply_stats_delta, stats_key
+
+
+@receiver([post_save, post_delete], sender=Task)
+def invalidate_task_caches(sender, instance, **kwargs):
+    # Bump after commit so a concurrent read cannot re-cache pre-write rows.
+    transaction.on_commit(bump_task_namespaces)
+
+
+@receiver(post_init, sender=Task)
+def remember_stats_key(sender, instance, **kwargs):
+    # Read through __dict__ so deferred fields are never fetched here.
+    instance._stats_key = (
+        (instance.__dict__.get("status"), instance.__dict__.get("priority"))
+        if instance.pk
+        else None
+    )
+    instance._due_date = instance.__dict__.get("due_date", DEFERRED)
+
+
+@receiver(pre_save, sender=Task)
+def stamp_status_change(sender, instance, **kwargs):
+    old_key = instance._stats_key
+    if old_key and old_key[0] is not None and old_key[0] != instance.status:
+        instance.status_changed_at = now()
+
+
+@receiver(pre_save, sender=Task)
+def rearm_deadline_reminder(sender, instance, **kwargs):
+    # A moved deadline deserves a fresh reminder.
+    old_due_date = instance._due_date
+    if old_due_date is DEFERRED:
+        return
+    if instance.pk and old_due_date != instance.due_date:
+        instance.reminded_at = None
+    instance._due_date = instance.due_date
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, **kwargs):
+    new_key = stats_key(instance)
+    old_key = instance._stats_key
+    if created:
+        apply_stats_delta({new_key: 1})
+    elif old_key and None not in old_key and old_key != new_key:
+        apply_stats_delta({old_key: -1, new_key: 1})
+    instance._stats_key = new_key
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, **kwargs):
+    apply_stats_delta({stats_key(instance): -1})
+
+
+@receiver(post_delete, sender=Task)
+def record_tombstone(sender, instance, **kwargs):
+    # Lets /api/tasks/changes/ report the delete to clients syncing later.
+    TaskTombstone.objects.create(task_id=instance.pk)
@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Task, TaskStats
+
+
+def stats_key(task):
+    return (task.status, task.priority)
+
+
+def apply_stats_delta(deltas):
+    """
+    Atomically add ``deltas`` ({(status, priority): change}) to ``TaskStats``.
+
+    Call inside the transaction that wrote the tasks: the row locks taken
+    here then serialize against ``reconcile_task_stats``. Keys are applied
+    in sorted order so concurrent writers always lock rows in the same order.
+    """
+    for (status, priority), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        rows = TaskStats.objects.filter(status=status, priority=priority)
+        if not rows.update(count=F("count") + delta):
+            TaskStats.objects.bulk_create(
+                [TaskStats(status=status, priority=priority)], ignore_conflicts=True
+            )
+            rows.update(count=F("count") + delta)
+
+
+def compute_task_stats():
+    """Count every (status, priority) pair in one conditional-aggregation query."""
+    pairs = [(status, priority) for status in Task.Status.values for priority in Task.Priority.values]
+    counts = Task.objects.aggregate(
+        **{
+            f"{status}__{priority}": Count("id", filter=Q(status=status, priority=priority))
+            for status, priority in pairs
+        }
+    )
+    return {(status, priority): counts[f"{status}__{priority}"] for status, priority in pairs}
+
+
+def reconcile_task_stats():
+    """Overwrite ``TaskStats`` with freshly computed counts, repairing any drift."""
+    with transaction.atomic():
+        # Lock the summary rows first so in-flight writers either finish
+        # before the recount or wait until it has been stored.
+        list(TaskStats.objects.select_for_update())
+        counts = compute_task_stats()
+        drift = {}
+        for (status, priority), count in counts.items():
+            # A missing row counts as zero, so creating it is drift too.
+            stats, _ = TaskStats.objects.get_or_create(status=status, priority=priority)
+            if stats.count != count:
+                drift[(status, priority)] = count - stats.count
+                stats.count = count
+                stats.save(update_fields=["count"])
+    return drift
+
+
+async def aget_report():
+    completed = pending = 0
+    by_priority = {}
+    rows = TaskStats.objects.values_list("status", "priority", "count")
+    async for status, priority, count in rows:
+        if status == Task.Status.COMPLETED:
+            completed += count
+        elif status == Task.Status.PENDING:
+            pending += count
+        if count:
+            by_priority[priority] = by_priority.get(priority, 0) + count
+    return {
+        "completed_tasks": completed,
+        "pending_tasks": pending,
+        "tasks_by_priority": by_priority,
+    }
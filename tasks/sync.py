@@ -0,0 +1,131 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+
+from .models import TaskTombstone
+
+SYNC_PAGE_SIZE = 500
+TOMBSTONE_RETENTION = timedelta(days=30)
+# Margin for timestamps taken in Python just before their transaction began.
+SYNC_LAG = timedelta(seconds=2)
+
+# Rows not yet committed carry timestamps no older than their transaction, so
+# everything before the oldest open transaction is final.
+SYNC_HORIZON_SQL = """
+    SELECT LEAST(clock_timestamp(), MIN(xact_start))
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+        AND backend_type = 'client backend'
+        AND pid <> pg_backend_pid()
+"""
+
+
+class SyncTokenExpired(Exception):
+    pass
+
+
+def sync_horizon():
+    """Upper bound below which no more task changes or deletes can appear."""
+    with connection.cursor() as cursor:
+        cursor.execute(SYNC_HORIZON_SQL)
+        (horizon,) = cursor.fetchone()
+    return horizon - SYNC_LAG
+
+
+def encode_sync_token(changed, deleted):
+    payload = {
+        "c": [changed[0].isoformat(), changed[1]],
+        "d": [deleted[0].isoformat(), deleted[1]],
+    }
+    return urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+
+def decode_sync_token(token):
+    """Return the ``(changed, deleted)`` keyset positions stored in ``token``."""
+    try:
+        payload = json.loads(urlsafe_b64decode(token.encode()))
+        positions = []
+        for key in ("c", "d"):
+            value, pk = payload[key]
+            value = parse_datetime(value)
+            if value is None:
+                raise ValueError
+            positions.append((value, int(pk)))
+    except (TypeError, ValueError, KeyError):
+        raise ValueError("Invalid sync token")
+    return tuple(positions)
+
+
+def sync_page_size(value):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return SYNC_PAGE_SIZE
+    return min(max(size, 1), SYNC_PAGE_SIZE)
+
+
+def after(field, position):
+    value, pk = position
+    return Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": pk})
+
+
+def seek_page(queryset, field, position, horizon, limit):
+    rows = list(
+        queryset.filter(after(field, position) if position else Q(), **{f"{field}__lt": horizon})
+        .order_by(field, "id")[: limit + 1]
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, (getattr(last, field), last.id), True
+    # Caught up: resume from the horizon, where no row is missing yet.
+    return rows, (horizon, 0), False
+
+
+def changes_since(queryset, token=None, limit=SYNC_PAGE_SIZE):
+    """
+    Tasks changed and ids deleted since ``token``, with the token to use next.
+
+    Both lists are keyset pages over ``(updated_at, id)`` and
+    ``(deleted_at, id)``, so a sync reads only the rows that changed. A sync
+    without a token walks every task from the beginning and skips
+    tombstones. Raises :class:`SyncTokenExpired` once the token is older
+    than the tombstones that are still kept.
+    """
+    horizon = sync_horizon()
+    if token:
+        changed_position, deleted_position = decode_sync_token(token)
+        if deleted_position[0] < now() - TOMBSTONE_RETENTION:
+            raise SyncTokenExpired("Sync token expired; reload all tasks")
+    else:
+        changed_position, deleted_position = None, (horizon, 0)
+
+    changed, changed_position, more_changed = seek_page(
+        queryset, "updated_at", changed_position, horizon, limit
+    )
+    tombstones, deleted_position, more_deleted = seek_page(
+        TaskTombstone.objects.only("task_id", "deleted_at"),
+        "deleted_at",
+        deleted_position,
+        horizon,
+        limit,
+    )
+    return {
+        "changed": changed,
+        "deleted": [tombstone.task_id for tombstone in tombstones],
+        "next": encode_sync_token(changed_position, deleted_position),
+        "has_more": more_changed or more_deleted,
+    }
+
+
+def purge_tombstones():
+    """Delete tombstones older than any sync token that is still accepted."""
+    deleted, _ = TaskTombstone.objects.filter(
+        deleted_at__lt=now() - TOMBSTONE_RETENTION
+    ).delete()
+    return deleted
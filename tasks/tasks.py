@@ -1,15 +1,37 @@
 import os
+import tempfile
 from pathlib import Path
 from celery import shared_task
-from django.core.mail import send_mail
-from datetime import timedelta
+from celery.signals import worker_process_shutdown
+from django.core.cache import cache
+from django.core.files import File
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import transaction
 from django.utils.timezone import now
-from .models import Task
+from .exports import EXPORT_WRITERS, chunked, export_rows
+from .filters import filter_tasks
+from .mail import close_pooled_connections
+from .models import ExportJob, Task
+from .reminders import REMINDER_WINDOW, claim_reminder_window, reminder_chunks, reminder_digest
+from .rollups import refresh_task_rollups as refresh_rollups
+from .stats import reconcile_task_stats as reconcile_stats
+from .sync import purge_tombstones
+
+ASSIGNMENT_COALESCE_WINDOW = 30
+# The digest runs this long after its window closes, so an assignment that
+# lands as it runs always finds the window closed and schedules a new one.
+ASSIGNMENT_DIGEST_GRACE = 5
+
+
+@worker_process_shutdown.connect
+def close_mail_connections(**kwargs):
+    close_pooled_connections()
+
 
 @shared_task(bind=True, default_retry_delay=60, max_retries=5)
 def send_task_assignment_email(self,task_id):
     try:
-        task = Task.objects.get(id=task_id)
+        task = Task.objects.select_related("assigned_to").get(id=task_id)
         send_mail(
             subject="Task Assigned",
             message=f"You have been assigned a new task: {task.title}",
@@ -19,16 +41,205 @@ def send_task_assignment_email(self,task_id):
     except Exception as e:
         raise self.retry(exc=e)
 
-@shared_task
+
+def queue_assignment_email(task):
+    queue_assignment_emails([task.assigned_to_id])
+
+
+def queue_assignment_emails(user_ids):
+    """
+    Coalesce assignment mails per assignee over ``ASSIGNMENT_COALESCE_WINDOW``.
+
+    The first assignment for a user in a window schedules a digest for the
+    end of it; later ones just ride along. Users needing a new digest share a
+    single Celery message. Call after the tasks have been committed.
+    """
+    pending = [
+        user_id
+        for user_id in sorted(set(user_ids))
+        if cache.add(f"assignment_mail:{user_id}", 1, timeout=ASSIGNMENT_COALESCE_WINDOW)
+    ]
+    if not pending:
+        return
+    try:
+        send_assignment_digests.apply_async(
+            (pending,), countdown=ASSIGNMENT_COALESCE_WINDOW + ASSIGNMENT_DIGEST_GRACE
+        )
+    except Exception:
+        # Reopen the window so a retry schedules the digest again.
+        cache.delete_many([f"assignment_mail:{user_id}" for user_id in pending])
+        raise
+
+
+@shared_task(bind=True, default_retry_delay=60, max_retries=5)
+def send_assignment_digests(self, user_ids):
+    # Users already mailed are skipped on retry: their tasks are stamped.
+    try:
+        return sum(mail_assignment_digest(user_id) for user_id in user_ids)
+    except Exception as e:
+        raise self.retry(exc=e)
+
+
+def mail_assignment_digest(user_id):
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(of=("self",), skip_locked=True)
+            .select_related("assigned_to")
+            .filter(assigned_to_id=user_id, assignment_notified_at__isnull=True)
+            .order_by("id")
+        )
+        if not tasks:
+            return 0
+        if len(tasks) == 1:
+            subject = "Task Assigned"
+            message = f"You have been assigned a new task: {tasks[0].title}"
+        else:
+            subject = "Tasks Assigned"
+            message = "\n".join(
+                [f"You have been assigned {len(tasks)} new tasks:", ""]
+                + [f"- {task.title}" for task in tasks]
+            )
+        send_mail(
+            subject=subject,
+            message=message,
+            from_email=os.getenv("EMAIL_HOST_USER"),
+            recipient_list=[tasks[0].assigned_to.email],
+        )
+        Task.objects.filter(id__in=[task.id for task in tasks]).update(
+            assignment_notified_at=now()
+        )
+    return len(tasks)
+
+
+@shared_task(bind=True, default_retry_delay=60, max_retries=5)
 def send_task_deadline_reminder(self):
+    """Fan the due dates that entered the reminder horizon out to chunks."""
     try:
-        tasks = Task.objects.filter(due_date__lte=now() + timedelta(hours=24), status=Task.Status.PENDING)
-        for task in tasks:
-            send_mail(
-                subject="Task Deadline Approaching",
-                message=f"Your task '{task.title}' is due soon.",
-                from_email=os.getenv("EMAIL_HOST_USER"),
-                recipient_list=[task.assigned_to.email]
+        claim_reminder_window(send_deadline_reminder_chunk.delay)
+    except Exception as e:
+        raise self.retry(exc=e)
+
+
+@shared_task(bind=True, default_retry_delay=60, max_retries=5)
+def send_deadline_reminder_chunk(self, task_ids):
+    try:
+        with transaction.atomic():
+            # Rows another worker is reminding are skipped, and reminded_at is
+            # only committed once the whole chunk has been handed to SMTP.
+            # Re-checking the horizon turns reminders for deadlines that have
+            # since moved out of it into no-ops.
+            tasks = list(
+                Task.objects.select_for_update(of=("self",), skip_locked=True)
+                .select_related("assigned_to")
+                .filter(
+                    id__in=task_ids,
+                    status=Task.Status.PENDING,
+                    due_date__lte=now() + REMINDER_WINDOW,
+                    reminded_at__isnull=True,
+                )
+                .order_by("assigned_to_id", "due_date", "id")
             )
+            if not tasks:
+                return 0
+
+            digests = {}
+            for task in tasks:
+                digests.setdefault(task.assigned_to, []).append(task)
+            connection = get_connection()
+            messages = [
+                EmailMessage(
+                    subject="Task Deadline Approaching",
+                    body=reminder_digest(assignee_tasks),
+                    from_email=os.getenv("EMAIL_HOST_USER"),
+                    to=[assignee.email],
+                    connection=connection,
+                )
+                for assignee, assignee_tasks in digests.items()
+            ]
+            connection.send_messages(messages)
+            Task.objects.filter(id__in=[task.id for task in tasks]).update(reminded_at=now())
+        return len(messages)
     except Exception as e:
-        raise self.retry(exc=e)
\ No newline at end of file
+        raise self.retry(exc=e)
+
+
+def schedule_deadline_reminders(tasks):
+    """
+    Queue reminders for tasks whose deadline was just set or moved.
+
+    Deadlines beyond the horizon are left to the sweep, which reaches them
+    within one beat interval. Ones already inside it may lie behind the
+    sweep watermark, so they are queued with an ETA of the moment they
+    entered the horizon, which is never later than now.
+    """
+    horizon = now() + REMINDER_WINDOW
+    due = [
+        task
+        for task in tasks
+        if task.status == Task.Status.PENDING
+        and task.due_date is not None
+        and task.due_date <= horizon
+    ]
+    if not due:
+        return
+    remind_at = min(task.due_date for task in due) - REMINDER_WINDOW
+    for chunk in reminder_chunks(sorted((task.assigned_to_id, task.id) for task in due)):
+        send_deadline_reminder_chunk.apply_async((chunk,), eta=remind_at)
+
+@shared_task(bind=True)
+def run_export_job(self, job_id):
+    job = ExportJob.objects.get(id=job_id)
+    jobs = ExportJob.objects.filter(id=job_id)
+    try:
+        tasks = filter_tasks(Task.objects.all(), job.filters)
+        jobs.update(status=ExportJob.Status.RUNNING, total_rows=tasks.count())
+
+        writer_class = EXPORT_WRITERS[job.format]
+        exported = 0
+        # Chunks are spooled to a local temp file and handed to the storage
+        # backend once complete, so object storage only sees a finished file.
+        with tempfile.TemporaryFile() as fileobj:
+            writer = writer_class(fileobj)
+            for chunk in chunked(export_rows(tasks)):
+                writer.write(chunk)
+                exported += len(chunk)
+                jobs.update(exported_rows=exported)
+            writer.close()
+
+            fileobj.seek(0)
+            name = f"tasks_export_{job.id}.{writer_class.extension}"
+            job.file.save(name, File(fileobj), save=False)
+
+        jobs.update(
+            status=ExportJob.Status.COMPLETED,
+            file=job.file.name,
+            exported_rows=exported,
+            completed_at=now(),
+        )
+    except Exception as e:
+        jobs.update(status=ExportJob.Status.FAILED, error=str(e), completed_at=now())
+        raise
+
+
+@shared_task
+def reconcile_task_stats():
+    drift = reconcile_stats()
+    return {f"{status}/{priority}": delta for (status, priority), delta in drift.items()}
+
+
+@shared_task
+def refresh_task_rollups():
+    return refresh_rollups()
+
+
+@shared_task
+def purge_task_tombstones():
+    return purge_tombstones()
+
+
+@shared_task
+def dispatch_task_outbox():
+    # Imported here: the outbox delivers through the helpers in this module.
+    from .outbox import drain_outbox
+
+    return drain_outbox()
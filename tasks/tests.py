@@ -1,3 +1,2040 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from importlib import import_module
+from io import BytesIO, StringIO
+from unittest.mock import patch
+from urllib.parse import urlencode
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection
+from django.db.models import F
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.utils.timezone import now
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from taskmanager.asgi import application
+from users.models import User
+from . import cache as cache_module
+from . import consumers, events, outbox, sync
+from . import mail as pooled_mail
+from .async_views import AsyncUserRateThrottle
+from .broadcast import task_event, user_group
+from .cache import (
+    LIST_NAMESPACE,
+    aget_or_compute,
+    bump_task_namespaces,
+    get_cache_stats,
+    get_or_compute,
+    namespaced_key,
+)
+from .consumers import CLOSE_FORBIDDEN, CLOSE_UNAUTHENTICATED
+from .exports import EXPORT_FIELDS
+from .filters import filter_tasks
+from .imports import import_tasks_csv
+from .models import (
+    ExportJob,
+    Task,
+    TaskDailyRollup,
+    TaskOutbox,
+    TaskStats,
+    TaskTombstone,
+    Watermark,
+)
+from .pivot import compute_pivot
+from .rollups import ROLLUP_WATERMARK, refresh_task_rollups
+from .stats import compute_task_stats, reconcile_task_stats
+from .tasks import (
+    queue_assignment_email,
+    queue_assignment_emails,
+    send_assignment_digests,
+    send_deadline_reminder_chunk,
+    send_task_deadline_reminder,
+)
+
+TEST_SETTINGS = {
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    "CHANNEL_LAYERS": {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+}
+
+
+def streamed(response):
+    """Collect a streaming response's chunks the way an ASGI server would."""
+
+    async def collect():
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    return async_to_sync(collect)()
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskQueryBudgetTests(TestCase):
+    """Serializing tasks must not cost extra queries per row."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        cls.assignees = [
+            User.objects.create_user(f"user{i}@example.com", f"User {i}", "password")
+            for i in range(5)
+        ]
+        Task.objects.bulk_create(
+            Task(
+                title=f"Task {i}",
+                assigned_to=cls.assignees[i % 5],
+                created_by=cls.owner,
+            )
+            for i in range(50)
+        )
+        reconcile_task_stats()
+        cls.task = Task.objects.first()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_list_page_number(self):
+        # COUNT(*) + one joined page query; the ETag is built from the page.
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/tasks/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_cursor(self):
+        # One joined page query, no COUNT(*) and no ETag aggregate.
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/tasks/", {"pagination": "cursor"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_retrieve(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/tasks/{self.task.id}/")
+        self.assertEqual(response.json()["assigned_to"], self.task.assigned_to.email)
+
+    @patch("tasks.tasks.send_assignment_digests.apply_async")
+    def test_post(self, apply_async):
+        # Assignee lookup, then INSERT + TaskStats increment + one outbox
+        # INSERT inside a savepoint; side effects wait for the dispatcher.
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                "/api/tasks/",
+                {
+                    "title": "New",
+                    "priority": Task.Priority.HIGH,
+                    "status": Task.Status.PENDING,
+                    "assigned_to": "user1@example.com",
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+        apply_async.assert_not_called()
+        outbox.drain_outbox()
+        apply_async.assert_called_once()
+
+    def test_put(self):
+        # SELECT ... FOR UPDATE + UPDATE + outbox INSERT, wrapped in the
+        # savepoint that transaction.atomic() issues inside TestCase's own
+        # transaction.
+        with self.assertNumQueries(5):
+            response = self.client.put(
+                f"/api/tasks/{self.task.id}/", {"title": "Renamed"}, format="json"
+            )
+        self.assertEqual(response.json()["data"]["created_by"], self.owner.email)
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskFilterIndexTests(TestCase):
+    """Each list filter must be answerable from an index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(f"user{i}@example.com", f"User {i}", "password")
+            for i in range(20)
+        ]
+        start = now()
+        Task.objects.bulk_create(
+            Task(
+                title=f"Task {i}",
+                priority=Task.Priority.values[i % 3],
+                status=Task.Status.values[i % 3],
+                due_date=start + timedelta(hours=i),
+                assigned_to=cls.users[i % 20],
+                created_by=cls.users[(i + 1) % 20],
+            )
+            for i in range(5000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE tasks_task")
+            cursor.execute("ANALYZE users_user")
+
+    def explain(self, **params):
+        queryset = filter_tasks(Task.objects.all(), params).order_by("-created_at", "-id")
+        with connection.cursor() as cursor:
+            # The seeded table is small enough that a seq scan would win on
+            # cost; disable it so the plan shows which index is usable.
+            cursor.execute("SET enable_seqscan = off")
+            try:
+                return queryset.explain()
+            finally:
+                cursor.execute("RESET enable_seqscan")
+
+    def assertIndexScan(self, plan, index_name=None):
+        self.assertNotIn("Seq Scan", plan)
+        self.assertRegex(plan, r"Index (Only )?Scan")
+        if index_name:
+            self.assertIn(index_name, plan)
+
+    def test_status(self):
+        self.assertIndexScan(self.explain(status="PENDING"))
+
+    def test_priority(self):
+        self.assertIndexScan(self.explain(priority="High"), "task_priority_created_idx")
+
+    def test_due_date(self):
+        day = (now() + timedelta(days=2)).date().isoformat()
+        self.assertIndexScan(self.explain(due_date=day), "task_due_date_id_idx")
+
+    def test_assigned_to(self):
+        plan = self.explain(assigned_to="USER3@example.com")
+        self.assertIndexScan(plan, "user_email_lower_idx")
+
+    def test_assigned_to_and_status(self):
+        plan = self.explain(assigned_to="user3@example.com", status="completed")
+        self.assertIndexScan(plan, "task_assignee_status_idx")
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskCursorPaginationTests(TestCase):
+    """Cursor pages walk every task once, in order, in both directions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        start = now()
+        due_dates = [start + timedelta(days=2), None, start + timedelta(days=1), None]
+        due_dates += [start + timedelta(days=1), start + timedelta(days=3), None]
+        cls.tasks = [
+            Task.objects.create(
+                title=f"Task {i}",
+                due_date=due_date,
+                assigned_to=cls.owner,
+                created_by=cls.owner,
+            )
+            for i, due_date in enumerate(due_dates)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def walk(self, ordering, page_size=2):
+        pages, url = [], "/api/tasks/"
+        params = {"pagination": "cursor", "ordering": ordering, "page_size": page_size}
+        while url:
+            page = self.client.get(url, params).json()
+            pages.append(page)
+            url, params = page["next"], None
+        return pages
+
+    def expected(self, ordering):
+        # Tasks without a due date sort after every dated task.
+        def key(task):
+            value = getattr(task, ordering.lstrip("-"))
+            return (value is None, value or now(), task.id)
+
+        tasks = sorted(self.tasks, key=key, reverse=ordering.startswith("-"))
+        return [task.id for task in tasks]
+
+    def ids(self, pages):
+        return [task["id"] for page in pages for task in page["results"]]
+
+    def test_due_date_nulls_last(self):
+        pages = self.walk("due_date")
+        self.assertEqual(self.ids(pages), self.expected("due_date"))
+        self.assertIsNone(pages[0]["previous"])
+        self.assertEqual(len(pages), 4)
+
+    def test_descending_due_date_nulls_first(self):
+        self.assertEqual(self.ids(self.walk("-due_date")), self.expected("-due_date"))
+
+    def test_created_at(self):
+        pages = self.walk("-created_at", page_size=3)
+        self.assertEqual(self.ids(pages), self.expected("-created_at"))
+
+    def test_previous_links_return_the_same_pages(self):
+        pages = self.walk("due_date")
+        url, backwards = pages[-1]["previous"], [pages[-1]]
+        while url:
+            page = self.client.get(url).json()
+            backwards.insert(0, page)
+            url = page["previous"]
+        self.assertEqual(
+            [[task["id"] for task in page["results"]] for page in backwards],
+            [[task["id"] for task in page["results"]] for page in pages],
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/tasks/", {"cursor": "garbage"})
+        self.assertEqual(response.json(), {"message": "Invalid cursor"})
+        # A cursor issued for one ordering is not accepted for another.
+        cursor = self.walk("due_date")[0]["next"].split("cursor=")[1]
+        response = self.client.get("/api/tasks/", {"cursor": cursor, "ordering": "-created_at"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskSearchTests(TestCase):
+    """Search ranks full-text matches and falls back to fuzzy titles."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        for title, description in [
+            ("Quarterly reports", "Collect the numbers"),
+            ("Plan offsite", "Book a venue and prepare the quarterly report deck"),
+            ("Fix login", "Users cannot sign in"),
+        ]:
+            Task.objects.create(
+                title=title, description=description, assigned_to=cls.owner, created_by=cls.owner
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def search(self, query):
+        response = self.client.get("/api/tasks/search/", {"q": query})
+        return [task["title"] for task in response.json()["results"]]
+
+    def test_stemmed_and_ranked_by_field_weight(self):
+        # Title matches outrank description matches.
+        self.assertEqual(self.search("report"), ["Quarterly reports", "Plan offsite"])
+
+    def test_websearch_syntax(self):
+        self.assertEqual(self.search("quarterly -offsite"), ["Quarterly reports"])
+
+    def test_misspelling_falls_back_to_title_similarity(self):
+        self.assertEqual(self.search("quartrly reprts"), ["Quarterly reports"])
+
+    def test_query_required(self):
+        response = self.client.get("/api/tasks/search/", {"q": " "})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskCacheInvalidationTests(TestCase):
+    """Cached lists and reports are dropped once a write commits."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        cls.task = Task.objects.create(title="First", assigned_to=cls.owner, created_by=cls.owner)
+        reconcile_task_stats()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def count(self):
+        return self.client.get("/api/tasks/").json()["count"]
+
+    def test_invalidated_after_commit(self):
+        self.assertEqual(self.count(), 1)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Task.objects.create(title="Second", assigned_to=self.owner, created_by=self.owner)
+        # Until the write commits, readers keep getting the cached page.
+        self.assertEqual(self.count(), 1)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.count(), 2)
+
+    def test_update_and_delete(self):
+        self.assertEqual(self.client.get("/api/tasks/report/").json()["pending_tasks"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                f"/api/tasks/{self.task.id}/", {"status": Task.Status.COMPLETED}, format="json"
+            )
+        report = self.client.get("/api/tasks/report/").json()
+        self.assertEqual((report["pending_tasks"], report["completed_tasks"]), (0, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/tasks/{self.task.id}/")
+        self.assertEqual(self.count(), 0)
+
+    def test_bump_orphans_every_key_in_namespace(self):
+        first = namespaced_key(LIST_NAMESPACE, "page")
+        self.assertEqual(namespaced_key(LIST_NAMESPACE, "page"), first)
+        bump_task_namespaces()
+        self.assertNotEqual(namespaced_key(LIST_NAMESPACE, "page"), first)
+
+    def test_lost_version_moves_forward(self):
+        first = namespaced_key(LIST_NAMESPACE, "page")
+        cache.delete(f"ns:{LIST_NAMESPACE}")
+        bump_task_namespaces()
+        self.assertNotEqual(namespaced_key(LIST_NAMESPACE, "page"), first)
+
+
+@override_settings(**TEST_SETTINGS)
+class SingleFlightCacheTests(TestCase):
+    """Concurrent misses recompute a cached value once."""
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def slow_compute(self):
+        self.calls += 1
+        time.sleep(0.2)
+        return "fresh"
+
+    def test_one_recompute_under_concurrent_misses(self):
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    get_or_compute("key", self.slow_compute, 60, LIST_NAMESPACE)
+                )
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["fresh"] * 8)
+        self.assertEqual(self.calls, 1)
+        stats = get_cache_stats()[LIST_NAMESPACE]
+        self.assertEqual((stats["miss"], stats["hit"]), (1, 7))
+
+    def test_async_one_recompute_under_concurrent_misses(self):
+        async def slow_compute():
+            self.calls += 1
+            await asyncio.sleep(0.2)
+            return "fresh"
+
+        async def read_concurrently():
+            return await asyncio.gather(
+                *(aget_or_compute("key", slow_compute, 60, LIST_NAMESPACE) for _ in range(8))
+            )
+
+        self.assertEqual(async_to_sync(read_concurrently)(), ["fresh"] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_expired_value_served_stale_while_refreshing(self):
+        get_or_compute("key", lambda: "old", 60, LIST_NAMESPACE)
+        entry = cache.get("key")
+        entry["expires_at"] = time.time() - 1
+        cache.set("key", entry)
+        # Another worker holds the refresh lock.
+        cache.add("lock:key", "other", 10)
+        self.assertEqual(get_or_compute("key", self.slow_compute, 60, LIST_NAMESPACE), "old")
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(get_cache_stats()[LIST_NAMESPACE]["stale"], 1)
+
+    def test_refreshed_early_as_expiry_nears(self):
+        get_or_compute("key", lambda: "old", 60, LIST_NAMESPACE)
+        self.assertEqual(get_or_compute("key", self.slow_compute, 60, LIST_NAMESPACE), "old")
+        # A huge beta makes XFetch certain to refresh before expiry.
+        with patch.object(cache_module, "XFETCH_BETA", 10**9):
+            entry = cache.get("key")
+            entry["delta"] = 1.0
+            cache.set("key", entry)
+            self.assertEqual(get_or_compute("key", self.slow_compute, 60, LIST_NAMESPACE), "fresh")
+        self.assertEqual(self.calls, 1)
+
+
+@override_settings(**TEST_SETTINGS)
+class ConditionalRequestTests(TestCase):
+    """ETag and Last-Modified validators answer 304 and 412 correctly."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        cls.task = Task.objects.create(title="First", assigned_to=cls.owner, created_by=cls.owner)
+        Task.objects.create(title="Second", assigned_to=cls.owner, created_by=cls.owner)
+        # A sub-second timestamp, which Last-Modified cannot express.
+        Task.objects.filter(id=cls.task.id).update(
+            updated_at=now().replace(microsecond=700000) - timedelta(minutes=5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = f"/api/tasks/{self.task.id}/"
+
+    def test_retrieve_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_put_with_current_validators_succeeds(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.put(
+            self.url, {"title": "Renamed"}, format="json", HTTP_IF_UNMODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.put(
+            self.url, {"title": "Again"}, format="json", HTTP_IF_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.get(id=self.task.id).title, "Again")
+
+    def test_put_with_stale_etag_fails(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.put(self.url, {"title": "Theirs"}, format="json", HTTP_IF_MATCH=etag)
+        response = self.client.put(self.url, {"title": "Mine"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(Task.objects.get(id=self.task.id).title, "Theirs")
+
+    def test_list_revalidated_by_etag_only(self):
+        response = self.client.get("/api/tasks/")
+        etag = response["ETag"]
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Deleting a task does not move max(updated_at), but it changes the ETag.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/tasks/{self.task.id}/")
+        response = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 1)
+        response = self.client.get(
+            "/api/tasks/", HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_cursor_page_revalidated_by_etag(self):
+        params = {"pagination": "cursor"}
+        etag = self.client.get("/api/tasks/", params)["ETag"]
+        self.assertEqual(
+            self.client.get("/api/tasks/", params, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        # An edit to a listed task moves the page's max(updated_at).
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f"/api/tasks/{self.task.id}/", {"title": "Edited"}, format="json")
+        response = self.client.get("/api/tasks/", params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Edited", [task["title"] for task in response.json()["results"]])
+
+
+@override_settings(**TEST_SETTINGS)
+@patch("tasks.tasks.send_assignment_digests.apply_async")
+class TaskStatsTests(TestCase):
+    """TaskStats follows every create, update and delete, and the report reads it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def counts(self):
+        return {
+            (row.status, row.priority): row.count for row in TaskStats.objects.filter(count__gt=0)
+        }
+
+    def assertStatsConsistent(self):
+        expected = {key: count for key, count in compute_task_stats().items() if count}
+        self.assertEqual(self.counts(), expected)
+
+    def create(self, priority):
+        response = self.client.post(
+            "/api/tasks/",
+            {
+                "title": "Task",
+                "assigned_to": self.owner.email,
+                "priority": priority,
+                "status": Task.Status.PENDING,
+            },
+            format="json",
+        )
+        return response.json()["data"]["id"]
+
+    def test_counters_follow_writes(self, apply_async):
+        first = self.create(Task.Priority.HIGH)
+        second = self.create(Task.Priority.HIGH)
+        self.create(Task.Priority.LOW)
+        self.assertEqual(
+            self.counts(),
+            {
+                (Task.Status.PENDING, Task.Priority.HIGH): 2,
+                (Task.Status.PENDING, Task.Priority.LOW): 1,
+            },
+        )
+
+        self.client.put(f"/api/tasks/{first}/", {"status": Task.Status.COMPLETED}, format="json")
+        self.client.put(f"/api/tasks/{second}/", {"priority": Task.Priority.LOW}, format="json")
+        # Edits that leave status and priority alone do not touch the counters.
+        self.client.put(f"/api/tasks/{second}/", {"title": "Renamed"}, format="json")
+        self.assertEqual(
+            self.counts(),
+            {
+                (Task.Status.COMPLETED, Task.Priority.HIGH): 1,
+                (Task.Status.PENDING, Task.Priority.LOW): 2,
+            },
+        )
+
+        self.client.delete(f"/api/tasks/{second}/")
+        self.assertStatsConsistent()
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.filter(id=first).delete()
+        self.assertStatsConsistent()
+
+        report = self.client.get("/api/tasks/report/").json()
+        self.assertEqual(report["pending_tasks"], 1)
+        self.assertEqual(report["completed_tasks"], 0)
+        self.assertEqual(report["tasks_by_priority"], {Task.Priority.LOW: 1})
+
+    def test_reconcile_repairs_drift(self, apply_async):
+        self.create(Task.Priority.MEDIUM)
+        # Writes that skip signals leave the counters behind.
+        Task.objects.update(status=Task.Status.COMPLETED)
+        drift = reconcile_task_stats()
+        self.assertEqual(
+            drift,
+            {
+                (Task.Status.PENDING, Task.Priority.MEDIUM): -1,
+                (Task.Status.COMPLETED, Task.Priority.MEDIUM): 1,
+            },
+        )
+        self.assertStatsConsistent()
+        self.assertEqual(reconcile_task_stats(), {})
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskRollupTests(TestCase):
+    """Status changes are folded into daily rollups once, up to the sync horizon."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def changed(self, status, at):
+        task = Task.objects.create(
+            title="Task", status=status, assigned_to=self.owner, created_by=self.owner
+        )
+        Task.objects.filter(id=task.id).update(status_changed_at=at)
+        return task
+
+    def totals(self):
+        return {
+            (row.status, row.priority): row.count for row in TaskDailyRollup.objects.all()
+        }
+
+    def test_folds_each_change_once(self):
+        self.changed(Task.Status.COMPLETED, now() - timedelta(hours=1))
+        self.changed(Task.Status.COMPLETED, now() - timedelta(hours=1))
+        self.changed(Task.Status.PENDING, now() - timedelta(hours=2))
+        # Too recent for the horizon: picked up by a later run instead.
+        self.changed(Task.Status.IN_PROGRESS, now())
+
+        self.assertEqual(refresh_task_rollups(), 2)
+        expected = {
+            (Task.Status.COMPLETED, Task.Priority.MEDIUM): 2,
+            (Task.Status.PENDING, Task.Priority.MEDIUM): 1,
+        }
+        self.assertEqual(self.totals(), expected)
+        refresh_task_rollups()
+        self.assertEqual(self.totals(), expected)
+
+    def test_stops_at_sync_horizon(self):
+        horizon = now() - timedelta(minutes=10)
+        self.changed(Task.Status.COMPLETED, horizon - timedelta(minutes=1))
+        # Stamped after the oldest open transaction began, so a change like it
+        # may still be uncommitted; it waits for the horizon to pass it.
+        self.changed(Task.Status.COMPLETED, horizon + timedelta(seconds=1))
+        with patch("tasks.rollups.sync_horizon", return_value=horizon):
+            refresh_task_rollups()
+        self.assertEqual(self.totals(), {(Task.Status.COMPLETED, Task.Priority.MEDIUM): 1})
+        self.assertEqual(Watermark.objects.get(name=ROLLUP_WATERMARK).value, horizon)
+
+        with patch("tasks.rollups.sync_horizon", return_value=horizon + timedelta(minutes=1)):
+            refresh_task_rollups()
+        self.assertEqual(self.totals(), {(Task.Status.COMPLETED, Task.Priority.MEDIUM): 2})
+
+    def test_analytics(self):
+        self.changed(Task.Status.COMPLETED, now() - timedelta(hours=1))
+        refresh_task_rollups()
+        response = self.client.get("/api/tasks/analytics/", {"status": "COMPLETED"})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(
+            [(row["assigned_to"], row["status"], row["count"]) for row in results],
+            [(self.owner.email, Task.Status.COMPLETED, 1)],
+        )
+        response = self.client.get("/api/tasks/analytics/", {"bucket": "year"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskPivotTests(TestCase):
+    """Pivots count only the cells that occur and label missing keys."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        cls.other = User.objects.create_user("other@example.com", "Other", "password")
+        due_date = now().replace(year=2030, month=1, day=9)
+        tasks = [
+            Task(
+                title=f"Task {i}",
+                status=Task.Status.values[i % 3],
+                priority=Task.Priority.values[i % 2],
+                due_date=due_date if i % 4 else None,
+                assigned_to=(cls.owner, cls.other)[i % 5 == 0],
+                created_by=cls.owner,
+            )
+            for i in range(40)
+        ]
+        Task.objects.bulk_create(tasks)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_matches_python_counts(self):
+        dims = ("status", "priority", "assigned_to")
+        result = compute_pivot({}, dims)
+        expected = {}
+        for task in Task.objects.select_related("assigned_to"):
+            cell = expected.setdefault(task.status, {}).setdefault(task.priority, {})
+            cell[task.assigned_to.email] = cell.get(task.assigned_to.email, 0) + 1
+        self.assertEqual(result, {"dimensions": list(dims), "total": 40, "data": expected})
+
+    def test_missing_keys(self):
+        # A status outside the choices must not borrow the last choice's label.
+        Task.objects.filter(id=Task.objects.order_by("id")[0].id).update(status="archived")
+        result = compute_pivot({}, ("status", "due_week"))
+        self.assertEqual(result["data"]["none"], {"none": 1})
+        self.assertEqual(result["data"][Task.Status.PENDING], {"none": 3, "2030-01-07": 10})
+        self.assertEqual(sum(result["data"][Task.Status.COMPLETED].values()), 13)
+
+    def test_empty(self):
+        result = compute_pivot({"status": "missing"}, ("status", "priority"))
+        self.assertEqual((result["total"], result["data"]), (0, {}))
+
+    def test_endpoint(self):
+        response = self.client.get("/api/tasks/pivot/", {"dims": "priority", "status": "pending"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"], {"low": 7, "medium": 7})
+        response = self.client.get("/api/tasks/pivot/", {"dims": "priority,colour"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend", **TEST_SETTINGS
+)
+class DeadlineReminderTests(TestCase):
+    """Reminders go out once per task, as one digest per assignee."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        cls.alice = User.objects.create_user("alice@example.com", "Alice", "password")
+        cls.bob = User.objects.create_user("bob@example.com", "Bob", "password")
+        soon = now() + timedelta(hours=2)
+        later = now() + timedelta(days=3)
+        for title, assignee, due_date, status in [
+            ("Alice 1", cls.alice, soon, Task.Status.PENDING),
+            ("Alice 2", cls.alice, soon, Task.Status.PENDING),
+            ("Alice 3", cls.alice, soon, Task.Status.PENDING),
+            ("Alice later", cls.alice, later, Task.Status.PENDING),
+            ("Alice done", cls.alice, soon, Task.Status.COMPLETED),
+            ("Alice overdue", cls.alice, now() - timedelta(days=2), Task.Status.PENDING),
+            ("Bob 1", cls.bob, soon, Task.Status.PENDING),
+        ]:
+            Task.objects.create(
+                title=title,
+                assigned_to=assignee,
+                created_by=cls.owner,
+                due_date=due_date,
+                status=status,
+            )
+
+    def setUp(self):
+        # Run fanned-out and ETA chunks inline instead of through a broker.
+        for patcher in (
+            patch.object(
+                send_deadline_reminder_chunk, "delay", side_effect=send_deadline_reminder_chunk
+            ),
+            patch.object(
+                send_deadline_reminder_chunk,
+                "apply_async",
+                side_effect=lambda args, **kwargs: send_deadline_reminder_chunk(*args),
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_reminders(self):
+        with patch("tasks.tasks.get_connection", wraps=get_connection) as connections:
+            send_task_deadline_reminder.apply().get()
+        return connections
+
+    def test_one_digest_per_assignee(self):
+        connections = self.run_reminders()
+        self.assertEqual(connections.call_count, 1)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["alice@example.com", "bob@example.com"],
+        )
+        alice = next(m for m in mail.outbox if m.to == ["alice@example.com"])
+        for title in ("Alice 1", "Alice 2", "Alice 3"):
+            self.assertIn(title, alice.body)
+        for title in ("Alice later", "Alice done", "Alice overdue"):
+            self.assertNotIn(title, alice.body)
+
+    def test_reminded_once(self):
+        self.run_reminders()
+        self.run_reminders()
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_sweep_reads_only_new_window(self):
+        self.run_reminders()
+        # The next sweep's window starts at the previous horizon, so it
+        # only reads the watermark and finds nothing to fan out.
+        with patch.object(send_deadline_reminder_chunk, "delay") as delay:
+            self.run_reminders()
+        delay.assert_not_called()
+
+    def test_broker_failure_keeps_window(self):
+        calls = []
+
+        def flaky_delay(chunk):
+            calls.append(chunk)
+            if len(calls) == 1:
+                raise ConnectionError("broker unavailable")
+            return send_deadline_reminder_chunk(chunk)
+
+        # The failed sweep leaves the watermark where it was, so its eager
+        # retry claims the same window and every reminder still goes out.
+        with patch.object(send_deadline_reminder_chunk, "delay", side_effect=flaky_delay):
+            self.run_reminders()
+        self.assertGreater(len(calls), 1)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["alice@example.com", "bob@example.com"],
+        )
+
+    def test_moved_deadline_is_reminded_again(self):
+        self.run_reminders()
+        task = Task.objects.get(title="Bob 1")
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        client.put(
+            f"/api/tasks/{task.id}/",
+            {"due_date": (now() + timedelta(hours=5)).isoformat()},
+            format="json",
+        )
+        outbox.drain_outbox()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[-1].to, ["bob@example.com"])
+
+    @patch("tasks.tasks.send_assignment_digests.apply_async")
+    def test_created_inside_horizon(self, apply_async):
+        self.run_reminders()
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        for hours in (3, 48):
+            client.post(
+                "/api/tasks/",
+                {
+                    "title": f"Bob in {hours}h",
+                    "priority": Task.Priority.HIGH,
+                    "status": Task.Status.PENDING,
+                    "due_date": (now() + timedelta(hours=hours)).isoformat(),
+                    "assigned_to": "bob@example.com",
+                },
+                format="json",
+            )
+        outbox.drain_outbox()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn("Bob in 3h", mail.outbox[-1].body)
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: no TLS, no AUTH, messages kept in memory."""
+
+    def handle(self):
+        self.server.connections += 1
+        self.server.sockets.append(self.request)
+        self.reply("220 stub ESMTP")
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 stub")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while (data := self.rfile.readline()) not in (b".\r\n", b""):
+                    lines.append(data)
+                self.server.messages.append(b"".join(lines))
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubSMTPHandler)
+        self.connections = 0
+        self.sockets = []
+        self.messages = []
+
+    def drop_connections(self):
+        for sock in self.sockets:
+            sock.shutdown(socket.SHUT_RDWR)
+        self.sockets.clear()
+
+
+class PooledEmailBackendTests(TestCase):
+    """Mail from one process shares a single SMTP session."""
+
+    def setUp(self):
+        self.server = StubSMTPServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(pooled_mail.close_pooled_connections)
+        settings = override_settings(
+            EMAIL_BACKEND="tasks.mail.PooledEmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=self.server.server_address[1],
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def send(self, count=1):
+        messages = [
+            EmailMessage("Subject", "Body", "from@example.com", ["to@example.com"])
+            for _ in range(count)
+        ]
+        return get_connection().send_messages(messages)
+
+    def test_connection_reused_across_sends(self):
+        for _ in range(3):
+            self.assertEqual(self.send(2), 2)
+        self.assertEqual(len(self.server.messages), 6)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_reconnects_after_drop(self):
+        self.send()
+        self.server.drop_connections()
+        self.assertEqual(self.send(2), 2)
+        self.assertEqual(len(self.server.messages), 3)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_idle_connection_health_checked(self):
+        self.send()
+        self.server.drop_connections()
+        with patch.object(pooled_mail, "HEALTH_CHECK_INTERVAL", 0), patch.object(
+            pooled_mail.PooledEmailBackend, "_send", wraps=pooled_mail.PooledEmailBackend._send,
+            autospec=True,
+        ) as send:
+            self.send()
+        # NOOP caught the dead session, so the message went out on the first try.
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_connection_retired_after_limit(self):
+        with patch.object(pooled_mail, "MAX_MESSAGES_PER_CONNECTION", 2):
+            self.send(2)
+            self.send(2)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_connection_retired_mid_batch(self):
+        with patch.object(pooled_mail, "MAX_MESSAGES_PER_CONNECTION", 2):
+            self.assertEqual(self.send(5), 5)
+        self.assertEqual(len(self.server.messages), 5)
+        self.assertEqual(self.server.connections, 3)
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend", **TEST_SETTINGS
+)
+class AssignmentDigestTests(TestCase):
+    """Assignments made within one window reach the assignee as one mail."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        cls.bob = User.objects.create_user("bob@example.com", "Bob", "password")
+
+    def setUp(self):
+        cache.clear()
+
+    @patch("tasks.tasks.send_assignment_digests.apply_async")
+    def test_assignments_coalesced(self, apply_async):
+        for i in range(3):
+            task = Task.objects.create(
+                title=f"Task {i}", assigned_to=self.bob, created_by=self.owner
+            )
+            queue_assignment_email(task)
+        apply_async.assert_called_once()
+
+        send_assignment_digests.apply(args=apply_async.call_args.args[0]).get()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["bob@example.com"])
+        for i in range(3):
+            self.assertIn(f"Task {i}", mail.outbox[0].body)
+
+        # A late digest for the same window finds nothing left to send.
+        send_assignment_digests.apply(args=apply_async.call_args.args[0]).get()
+        self.assertEqual(len(mail.outbox), 1)
+
+    @patch("tasks.tasks.send_assignment_digests.apply_async")
+    def test_digest_runs_after_window_closes(self, apply_async):
+        with patch("tasks.tasks.cache.add", wraps=cache.add) as add:
+            queue_assignment_emails([self.bob.id])
+        # Once the digest runs, a new assignment must open a fresh window.
+        self.assertGreater(
+            apply_async.call_args.kwargs["countdown"], add.call_args.kwargs["timeout"]
+        )
+
+
+@override_settings(**TEST_SETTINGS)
+@patch("tasks.tasks.send_assignment_digests.apply_async")
+class BulkTaskTests(TestCase):
+    """Bulk writes cost a fixed number of queries and report bad items."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        cls.other = User.objects.create_user("other@example.com", "Other", "password")
+        cls.assignees = [
+            User.objects.create_user(f"user{i}@example.com", f"User {i}", "password")
+            for i in range(5)
+        ]
+        cls.tasks = Task.objects.bulk_create(
+            Task(title=f"Task {i}", assigned_to=cls.assignees[0], created_by=cls.owner)
+            for i in range(10)
+        )
+        cls.foreign = Task.objects.create(
+            title="Not mine", assigned_to=cls.owner, created_by=cls.other
+        )
+        reconcile_task_stats()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def bulk(self, payload):
+        return self.client.post("/api/tasks/bulk/", payload, format="json")
+
+    def assertStatsConsistent(self):
+        stats = {
+            (row.status, row.priority): row.count for row in TaskStats.objects.all()
+        }
+        for key, count in compute_task_stats().items():
+            self.assertEqual(stats.get(key, 0), count, key)
+
+    def test_create_batch_query_budget(self, apply_async):
+        items = [
+            {"title": f"New {i}", "assigned_to": f"USER{i % 5}@example.com"}
+            for i in range(100)
+        ]
+        # Savepoint, email lookup, INSERT, one TaskStats update, one outbox
+        # INSERT, release.
+        with self.assertNumQueries(6):
+            response = self.bulk({"create": items})
+        self.assertEqual(len(response.data["data"]["created"]), 100)
+        self.assertEqual(response.data["data"]["errors"], {})
+        apply_async.assert_not_called()
+        outbox.drain_outbox()
+        apply_async.assert_called_once()
+        self.assertEqual(sorted(apply_async.call_args.args[0][0]), [u.id for u in self.assignees])
+        self.assertStatsConsistent()
+
+    def test_mixed_batch_with_errors(self, apply_async):
+        response = self.bulk(
+            {
+                "create": [
+                    {"title": "Good", "assigned_to": "user1@example.com", "priority": "high"},
+                    {"title": "Nobody", "assigned_to": "nobody@example.com"},
+                    {"title": "Bad", "assigned_to": "user1@example.com", "priority": "urgent"},
+                ],
+                "update": [
+                    {"id": self.tasks[0].id, "status": "completed"},
+                    {"id": self.foreign.id, "title": "Hijacked"},
+                    {"id": self.tasks[1].id, "priority": "urgent"},
+                ],
+                "delete": [self.tasks[2].id, self.foreign.id, 0],
+            }
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.data["data"]
+        self.assertEqual([t["title"] for t in data["created"]], ["Good"])
+        self.assertEqual([t["id"] for t in data["updated"]], [self.tasks[0].id])
+        self.assertEqual(data["deleted"], [self.tasks[2].id])
+        self.assertEqual(
+            {op: [e["index"] for e in errors] for op, errors in data["errors"].items()},
+            {"create": [1, 2], "update": [1, 2], "delete": [1, 2]},
+        )
+
+        self.tasks[0].refresh_from_db()
+        self.assertEqual(self.tasks[0].status, Task.Status.COMPLETED)
+        self.assertGreater(self.tasks[0].status_changed_at, self.tasks[0].created_at)
+        self.assertEqual(Task.objects.get(id=self.foreign.id).title, "Not mine")
+        self.assertFalse(Task.objects.filter(id=self.tasks[2].id).exists())
+        self.assertStatsConsistent()
+
+    @patch.object(outbox, "asend_to_audiences")
+    def test_side_effects_committed_to_outbox(self, broadcasts, apply_async):
+        response = self.bulk(
+            {
+                "create": [
+                    {
+                        "title": "Soon",
+                        "assigned_to": "user1@example.com",
+                        "due_date": (now() + timedelta(hours=3)).isoformat(),
+                    }
+                ],
+                "update": [{"id": self.tasks[0].id, "title": "Renamed"}],
+                "delete": [self.tasks[1].id],
+            }
+        )
+        self.assertEqual(response.status_code, 200)
+        created = response.data["data"]["created"][0]["id"]
+        apply_async.assert_not_called()
+        broadcasts.assert_not_called()
+        self.assertEqual(
+            list(TaskOutbox.objects.order_by("id").values_list("kind", flat=True)),
+            ["assignment_email", "deadline_reminder", "broadcast", "broadcast", "broadcast"],
+        )
+
+        with patch.object(send_deadline_reminder_chunk, "apply_async") as reminder:
+            self.assertEqual(outbox.drain_outbox(), 5)
+        apply_async.assert_called_once()
+        reminder.assert_called_once()
+        broadcasts.assert_called_once()
+        self.assertEqual(
+            [(event["op"], event["id"]) for event in broadcasts.call_args.args[0][self.owner.id]],
+            [("created", created), ("updated", self.tasks[0].id), ("deleted", self.tasks[1].id)],
+        )
+
+    def test_booleans_are_not_ids(self, apply_async):
+        Task.objects.filter(id=1).delete()
+        Task.objects.create(id=1, title="One", assigned_to=self.owner, created_by=self.owner)
+        response = self.bulk({"update": [{"id": True, "title": "Renamed"}], "delete": [True]})
+        data = response.data["data"]
+        self.assertEqual((data["updated"], data["deleted"]), ([], []))
+        self.assertEqual(
+            {op: [e["index"] for e in errors] for op, errors in data["errors"].items()},
+            {"update": [0], "delete": [0]},
+        )
+        self.assertEqual(Task.objects.get(id=1).title, "One")
+
+    def test_rejects_oversized_batch(self, apply_async):
+        response = self.bulk({"delete": list(range(5001))})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskExportTests(TestCase):
+    """Exports stream as async iterators, honouring filters, gzip and ranges."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        Task.objects.bulk_create(
+            Task(
+                title=f"Task {i}",
+                status=Task.Status.values[i % 3],
+                assigned_to=cls.owner,
+                created_by=cls.owner,
+            )
+            for i in range(30)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+
+    def export(self, **params):
+        response = self.client.get("/api/tasks/export/", params)
+        # An async iterator lets ASGI send chunks as they are produced.
+        self.assertTrue(response.is_async)
+        return response, streamed(response)
+
+    def test_csv(self):
+        response, content = self.export(status="completed", compress="")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = content.decode().splitlines()
+        self.assertEqual(lines[0], ",".join(EXPORT_FIELDS))
+        self.assertEqual(len(lines), 11)
+        self.assertTrue(all(",completed," in line for line in lines[1:]))
+
+    def test_gzip(self):
+        _, plain = self.export()
+        response, compressed = self.export(compress="gzip")
+        self.assertEqual(response["Content-Disposition"], "attachment; filename=tasks_export.csv.gz")
+        self.assertEqual(gzip.decompress(compressed), plain)
+
+    def test_bad_filter(self):
+        response = self.client.get("/api/tasks/export/", {"due_date": "someday"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("due_date", response.json()["message"])
+
+    def finished_job(self, content):
+        job = ExportJob.objects.create(
+            status=ExportJob.Status.COMPLETED, created_by=self.owner, completed_at=now()
+        )
+        job.file.save("tasks_export.csv", ContentFile(content))
+        return f"/api/tasks/export-jobs/{job.id}/download/"
+
+    def download(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        return response, streamed(response) if response.streaming else b""
+
+    def test_range(self):
+        url = self.finished_job(b"0123456789abcdef")
+        response, content = self.download(url)
+        self.assertEqual((response.status_code, content), (200, b"0123456789abcdef"))
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        response, content = self.download(url, Range="bytes=2-5")
+        self.assertEqual((response.status_code, content), (206, b"2345"))
+        self.assertEqual(response["Content-Range"], "bytes 2-5/16")
+        response, content = self.download(url, Range="bytes=-3")
+        self.assertEqual((response.status_code, content), (206, b"def"))
+
+        response, _ = self.download(url, Range="bytes=20-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */16")
+
+        for validator in (etag, last_modified):
+            response, content = self.download(url, Range="bytes=10-", If_Range=validator)
+            self.assertEqual((response.status_code, content), (206, b"abcdef"))
+
+    def test_stale_if_range_sends_whole_file(self):
+        url = self.finished_job(b"0123456789")
+        for validator in ('"export-0"', "Thu, 01 Jan 2015 00:00:00 GMT"):
+            response, content = self.download(url, Range="bytes=5-", If_Range=validator)
+            self.assertEqual((response.status_code, content), (200, b"0123456789"))
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskImportTests(TestCase):
+    """CSV exports load back through COPY, rejecting bad rows individually."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        cls.alice = User.objects.create_user("alice@example.com", "Alice", "password")
+        Task.objects.bulk_create(
+            Task(
+                title=f"Task {i}",
+                description="" if i % 2 else f"Details {i}",
+                priority=Task.Priority.values[i % 3],
+                status=Task.Status.values[i % 3],
+                due_date=now() + timedelta(days=i) if i % 4 else None,
+                assigned_to=cls.alice,
+                created_by=cls.owner,
+            )
+            for i in range(20)
+        )
+        reconcile_task_stats()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def export_csv(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.get("/api/tasks/export/")
+        self.client.force_authenticate(self.alice)
+        return streamed(response)
+
+    def test_round_trip_through_api(self):
+        content = self.export_csv()
+        content += b"Broken,,urgent,,pending,owner@example.com,alice@example.com\r\n"
+        content += b"Orphan,,low,,pending,owner@example.com,nobody@example.com\r\n"
+        response = self.client.post(
+            "/api/tasks/import/",
+            {"file": SimpleUploadedFile("tasks.csv", content, content_type="text/csv")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        data = response.data["data"]
+        self.assertEqual((data["rows"], data["imported"], data["rejected"]), (22, 20, 2))
+        self.assertEqual([error["line"] for error in data["errors"]], [22, 23])
+
+        imported = Task.objects.filter(created_by=self.alice)
+        self.assertEqual(imported.count(), 20)
+        original = Task.objects.filter(created_by=self.owner)
+        # CSV cannot tell an empty description from a missing one.
+        fields = ("title", "priority", "status", "due_date")
+        self.assertEqual(
+            sorted(imported.values_list(*fields)), sorted(original.values_list(*fields))
+        )
+        self.assertEqual(
+            sorted(d or "" for d in imported.values_list("description", flat=True)),
+            sorted(d or "" for d in original.values_list("description", flat=True)),
+        )
+        self.assertEqual(
+            sum(TaskStats.objects.values_list("count", flat=True)), Task.objects.count()
+        )
+
+    def test_rejects_unknown_header(self):
+        response = self.client.post(
+            "/api/tasks/import/",
+            {"file": SimpleUploadedFile("tasks.csv", b"title,status\r\nA,pending\r\n")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Task.objects.filter(created_by=self.alice).exists())
+
+    def test_management_command_writes_rejected_rows(self):
+        content = self.export_csv() + b",,low,,pending,owner@example.com,alice@example.com\r\n"
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tasks.csv")
+            with open(path, "wb") as fileobj:
+                fileobj.write(content)
+            call_command("import_tasks", path, chunk_size=7, stdout=StringIO())
+            with open(f"{path}.rejected.csv") as rejected:
+                lines = rejected.read().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith("22,"))
+        self.assertIn("title is required", lines[1])
+        self.assertEqual(Task.objects.count(), 40)
+
+    def test_malformed_csv_reports_line(self):
+        content = self.export_csv() + b'"' + b"x" * (200 * 1024) + b'",,low\r\n'
+        response = self.client.post(
+            "/api/tasks/import/",
+            {"file": SimpleUploadedFile("tasks.csv", content, content_type="text/csv")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data["message"].startswith("Line 22: field larger"))
+        self.assertFalse(Task.objects.filter(created_by=self.alice).exists())
+
+    @patch("tasks.tasks.send_deadline_reminder_chunk.apply_async")
+    def test_queues_reminders_in_outbox(self, apply_async):
+        due_date = (now() + timedelta(hours=2)).isoformat()
+        later = (now() + timedelta(days=5)).isoformat()
+        content = ",".join(EXPORT_FIELDS).encode() + b"\r\n"
+        content += f"Soon,,low,{due_date},pending,owner@example.com,alice@example.com\r\n".encode()
+        content += f"Done,,low,{due_date},completed,owner@example.com,alice@example.com\r\n".encode()
+        content += f"Later,,low,{later},pending,owner@example.com,alice@example.com\r\n".encode()
+        result = import_tasks_csv(BytesIO(content))
+        self.assertEqual(result.imported, 3)
+        soon = Task.objects.get(title="Soon")
+        self.assertEqual(
+            list(TaskOutbox.objects.values_list("task_id", "kind")),
+            [(soon.id, TaskOutbox.Kind.DEADLINE_REMINDER)],
+        )
+        apply_async.assert_not_called()
+        outbox.drain_outbox()
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.args[0], ([soon.id],))
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskSocketTests(TransactionTestCase):
+    """Task events reach only interested sockets, filtered by their subscription."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        self.alice = User.objects.create_user("alice@example.com", "Alice", "password")
+        self.bob = User.objects.create_user("bob@example.com", "Bob", "password")
+        digests = patch("tasks.tasks.send_assignment_digests.apply_async")
+        digests.start()
+        self.addCleanup(digests.stop)
+        self.sockets = []
+
+    async def connect(self, user=None, path="/ws/tasks/", **params):
+        if user is not None:
+            path += "?" + urlencode({"token": AccessToken.for_user(user), **params})
+        communicator = WebsocketCommunicator(application, path)
+        connected, code = await communicator.connect()
+        if connected:
+            self.sockets.append(communicator)
+        return communicator, connected, code
+
+    async def disconnect(self):
+        for communicator in self.sockets:
+            await communicator.disconnect()
+
+    async def receive(self, communicator):
+        return json.loads(await communicator.receive_from(timeout=2))
+
+    @sync_to_async
+    def write(self, method, url, data=None):
+        """Make an API call as the owner and deliver its outbox entries."""
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = getattr(client, method)(url, data, format="json")
+        outbox.drain_outbox()
+        return response
+
+    async def create(self, title, assigned_to, **fields):
+        data = {"title": title, "assigned_to": assigned_to.email, "status": "pending"}
+        response = await self.write("post", "/api/tasks/", {"priority": "low", **data, **fields})
+        return response.json()["data"]["id"]
+
+    async def test_rejects_anonymous_and_strangers(self):
+        _, connected, code = await self.connect()
+        self.assertEqual((connected, code), (False, CLOSE_UNAUTHENTICATED))
+
+        task_id = await self.create("Private", self.alice)
+        _, connected, code = await self.connect(self.bob, f"/ws/tasks/{task_id}/")
+        self.assertEqual((connected, code), (False, CLOSE_FORBIDDEN))
+
+    async def test_events_reach_assignee_and_creator_only(self):
+        owner, _, _ = await self.connect(self.owner)
+        alice, _, _ = await self.connect(self.alice)
+        bob, _, _ = await self.connect(self.bob)
+
+        task_id = await self.create("Shared", self.alice)
+        for communicator in (owner, alice):
+            frame = await self.receive(communicator)
+            self.assertEqual([task["id"] for task in frame["batch"]["created"]], [task_id])
+        self.assertTrue(await bob.receive_nothing(timeout=0.2))
+
+        await self.write("post", "/api/tasks/bulk/", {"delete": [task_id]})
+        self.assertEqual((await self.receive(alice))["batch"], {"deleted": [task_id]})
+        self.assertTrue(await bob.receive_nothing(timeout=0.2))
+        await self.disconnect()
+
+    async def test_task_route_forwards_that_task_only(self):
+        followed = await self.create("Followed", self.alice)
+        other = await self.create("Other", self.alice)
+        alice, connected, _ = await self.connect(self.alice, f"/ws/tasks/{followed}/")
+        self.assertTrue(connected)
+
+        await self.write("put", f"/api/tasks/{other}/", {"title": "Ignored"})
+        await self.write("put", f"/api/tasks/{followed}/", {"title": "Renamed"})
+        frame = await self.receive(alice)
+        self.assertEqual(frame["batch"]["updated"][0]["id"], followed)
+        self.assertEqual(frame["batch"]["updated"][0]["title"], "Renamed")
+        self.assertTrue(await alice.receive_nothing(timeout=0.2))
+        await self.disconnect()
+
+    async def subscribe(self, communicator, filters):
+        await communicator.send_to(text_data=json.dumps({"action": "subscribe", "filters": filters}))
+        return await self.receive(communicator)
+
+    async def test_subscription_filters_events(self):
+        alice, _, _ = await self.connect(self.alice)
+        self.assertIn("error", await self.subscribe(alice, {"colour": "red"}))
+        reply = await self.subscribe(alice, {"priority": "HIGH", "title": "bug"})
+        self.assertEqual(reply, {"subscribed": {"priority": "HIGH", "title": "bug"}})
+
+        await self.create("Minor bug", self.alice)
+        await self.create("High feature", self.alice, priority="high")
+        self.assertTrue(await alice.receive_nothing(timeout=0.2))
+
+        task_id = await self.create("Urgent Bug", self.alice, priority="high")
+        frame = await self.receive(alice)
+        self.assertEqual([task["id"] for task in frame["batch"]["created"]], [task_id])
+
+        # Leaving the slice is reported so the client can drop the task.
+        await self.write("put", f"/api/tasks/{task_id}/", {"priority": "low"})
+        self.assertEqual((await self.receive(alice))["batch"], {"removed": [task_id]})
+        await self.write("put", f"/api/tasks/{task_id}/", {"title": "Low bug"})
+        self.assertTrue(await alice.receive_nothing(timeout=0.2))
+        # Re-entering it sends the whole task, not just the changed fields.
+        await self.write("put", f"/api/tasks/{task_id}/", {"priority": "high"})
+        updated = (await self.receive(alice))["batch"]["updated"]
+        self.assertEqual((updated[0]["id"], updated[0]["title"]), (task_id, "Low bug"))
+
+        await alice.send_to(text_data=json.dumps({"action": "unsubscribe"}))
+        self.assertEqual(await self.receive(alice), {"subscribed": None})
+        await self.create("Anything", self.alice)
+        self.assertIn("created", (await self.receive(alice))["batch"])
+        await self.disconnect()
+
+    async def publish(self, user, *task_ids, event_id=None):
+        events = [task_event("created", {"id": task_id, "title": "Task"}) for task_id in task_ids]
+        await get_channel_layer().group_send(
+            user_group(user.id),
+            {"type": "send_task_events", "events": events, "event_id": event_id},
+        )
+
+    async def ack(self, communicator, seq):
+        await communicator.send_to(text_data=json.dumps({"action": "ack", "seq": seq}))
+
+    @patch.object(consumers, "MAX_PENDING_TASKS", 5)
+    @patch.object(consumers, "MAX_UNACKED_FRAMES", 2)
+    async def test_unacknowledged_frames_hold_back_events(self):
+        alice, _, _ = await self.connect(self.alice)
+        await self.ack(alice, 0)
+        for task_id in (1, 2):
+            await self.publish(self.alice, task_id)
+            self.assertEqual((await self.receive(alice))["seq"], task_id)
+
+        # Two frames in flight: later events wait and merge on the server.
+        await self.publish(self.alice, 3)
+        await self.publish(self.alice, 4)
+        self.assertTrue(await alice.receive_nothing(timeout=0.2))
+        await self.ack(alice, 2)
+        frame = await self.receive(alice)
+        self.assertEqual(frame["seq"], 3)
+        self.assertEqual([task["id"] for task in frame["batch"]["created"]], [3, 4])
+
+        await self.publish(self.alice, 5)
+        self.assertEqual((await self.receive(alice))["seq"], 4)
+        await self.publish(self.alice, *range(10, 20))
+        self.assertTrue(await alice.receive_nothing(timeout=0.2))
+        await self.ack(alice, 4)
+        self.assertEqual(await self.receive(alice), {"resync": True, "event_id": None, "seq": 5})
+        await self.disconnect()
+
+    async def test_resume_skips_only_replayed_events(self):
+        first = await events.aappend_events(
+            self.alice.id, [task_event("created", {"id": 1, "title": "Task"})]
+        )
+        alice, _, _ = await self.connect(self.alice, last_event_id=first - 1)
+        frame = await self.receive(alice)
+        self.assertEqual((frame["batch"]["created"][0]["id"], frame["event_id"]), (1, first))
+
+        # The live copy of a replayed event is dropped; later ids arriving
+        # out of order are both delivered and the frame reports the highest.
+        await self.publish(self.alice, 1, event_id=first)
+        await self.publish(self.alice, 3, event_id=first + 2)
+        await self.publish(self.alice, 2, event_id=first + 1)
+        created = []
+        while len(created) < 2:
+            frame = await self.receive(alice)
+            created += [task["id"] for task in frame["batch"]["created"]]
+        self.assertEqual(sorted(created), [2, 3])
+        self.assertEqual(frame["event_id"], first + 2)
+        self.assertTrue(await alice.receive_nothing(timeout=0.2))
+        await self.disconnect()
+
+    @patch.object(consumers, "MAX_UNACKED_FRAMES", 2)
+    async def test_clients_without_acks_are_not_held_back(self):
+        alice, _, _ = await self.connect(self.alice)
+        for task_id in (1, 2, 3):
+            await self.publish(self.alice, task_id)
+            self.assertEqual((await self.receive(alice))["seq"], task_id)
+        await self.disconnect()
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskEventLogTests(TestCase):
+    """Reconnecting sockets replay missed events or are told to resync."""
+
+    def setUp(self):
+        cache.clear()
+
+    def append(self, user_id, entry):
+        return async_to_sync(events.aappend_events)(user_id, entry)
+
+    def replay(self, last_event_id):
+        return async_to_sync(events.read_events_since)(1, last_event_id)
+
+    def test_replays_events_after_id(self):
+        first = self.append(1, ["a"])
+        self.append(2, ["other user"])
+        second = self.append(1, ["b"])
+        third = self.append(1, ["c"])
+        self.assertEqual(second, first + 1)
+        self.assertEqual(self.replay(first), (third, [(second, ["b"]), (third, ["c"])]))
+        self.assertEqual(self.replay(third), (third, []))
+
+    def test_gap_too_old_needs_resync(self):
+        first = self.append(1, ["a"])
+        for _ in range(3):
+            latest = self.append(1, ["b"])
+        with patch.object(events, "EVENT_LOG_SIZE", 2):
+            self.assertEqual(self.replay(first), (latest, None))
+        cache.delete(f"task_events:1:{latest}")
+        self.assertEqual(self.replay(first), (latest, None))
+
+    def test_lost_sequence_moves_forward(self):
+        first = self.append(1, ["a"])
+        cache.delete("task_events:1:seq")
+        self.assertGreater(self.append(1, ["b"]), first)
+        self.assertEqual(self.replay(first + 10**12)[1], None)
+
+
+@override_settings(**TEST_SETTINGS)
+@patch.object(sync, "SYNC_LAG", timedelta(0))
+class TaskChangesTests(TestCase):
+    """Clients sync changes and deletes from a token instead of reloading."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        cls.tasks = Task.objects.bulk_create(
+            Task(title=f"Task {i}", assigned_to=cls.owner, created_by=cls.owner)
+            for i in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def changes(self, since=None, page_size=None):
+        params = {"since": since} if since else {}
+        if page_size:
+            params["page_size"] = page_size
+        response = self.client.get("/api/tasks/changes/", params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def sync_all(self, since=None, page_size=None):
+        changed, deleted = [], []
+        while True:
+            page = self.changes(since, page_size)
+            changed += [task["id"] for task in page["changed"]]
+            deleted += page["deleted"]
+            since = page["next"]
+            if not page["has_more"]:
+                return changed, deleted, since
+
+    def test_initial_sync_pages_through_tasks(self):
+        changed, deleted, token = self.sync_all(page_size=2)
+        self.assertEqual(changed, [task.id for task in self.tasks])
+        self.assertEqual(deleted, [])
+        self.assertEqual(self.changes(token)["changed"], [])
+
+    @patch("tasks.tasks.send_assignment_digests.apply_async")
+    def test_reports_updates_and_deletes_since_token(self, apply_async):
+        _, _, token = self.sync_all()
+        first, second, third, fourth = self.tasks[:4]
+        self.client.put(f"/api/tasks/{first.id}/", {"title": "Renamed"}, format="json")
+        self.client.delete(f"/api/tasks/{second.id}/")
+        self.client.post(
+            "/api/tasks/bulk/", {"delete": [third.id, fourth.id]}, format="json"
+        )
+
+        with self.assertNumQueries(3):
+            page = self.changes(token)
+        self.assertEqual([task["title"] for task in page["changed"]], ["Renamed"])
+        self.assertEqual(sorted(page["deleted"]), [second.id, third.id, fourth.id])
+        self.assertEqual(TaskTombstone.objects.count(), 3)
+        self.assertEqual(self.changes(page["next"])["deleted"], [])
+
+    def test_expired_and_invalid_tokens(self):
+        _, _, token = self.sync_all()
+        with patch.object(sync, "TOMBSTONE_RETENTION", timedelta(0)):
+            response = self.client.get("/api/tasks/changes/", {"since": token})
+        self.assertEqual(response.status_code, 410)
+        response = self.client.get("/api/tasks/changes/", {"since": "nonsense"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(**TEST_SETTINGS)
+class AsyncTaskViewTests(TestCase):
+    """The list, detail and report views run natively under AsyncClient."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        cls.other = User.objects.create_user("other@example.com", "Other", "password")
+        cls.task = Task.objects.create(title="First", assigned_to=cls.owner, created_by=cls.owner)
+        reconcile_task_stats()
+
+    def setUp(self):
+        cache.clear()
+        self.client = AsyncClient()
+        self.auth = self.auth_for(self.owner)
+
+    def auth_for(self, user):
+        # AsyncClient only sends headers given per request as HTTP headers.
+        return {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+    async def test_requires_token(self):
+        response = await self.client.get("/api/tasks/")
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+        response = await self.client.get("/api/tasks/", headers={"Authorization": "Bearer junk"})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_create_read_update_delete(self):
+        response = await self.client.post(
+            "/api/tasks/",
+            {
+                "title": "Second",
+                "assigned_to": self.other.email,
+                "priority": "high",
+                "status": "pending",
+            },
+            content_type="application/json",
+            headers=self.auth,
+        )
+        self.assertEqual(response.status_code, 201)
+        task_id = response.json()["data"]["id"]
+        self.assertTrue(await TaskOutbox.objects.filter(task_id=task_id).aexists())
+
+        response = await self.client.get("/api/tasks/", {"priority": "high"}, headers=self.auth)
+        self.assertEqual(response.json()["count"], 1)
+        self.assertEqual(response.json()["results"][0]["id"], task_id)
+
+        response = await self.client.put(
+            f"/api/tasks/{task_id}/",
+            {"status": "completed"},
+            content_type="application/json",
+            headers=self.auth,
+        )
+        self.assertEqual(response.json()["data"]["status"], "completed")
+        response = await self.client.get(f"/api/tasks/{task_id}/", headers=self.auth)
+        self.assertEqual((response.status_code, response.json()["status"]), (200, "completed"))
+
+        # Only the creator may edit or delete.
+        response = await self.client.delete(
+            f"/api/tasks/{task_id}/", headers=self.auth_for(self.other)
+        )
+        self.assertEqual(response.status_code, 400)
+        response = await self.client.delete(f"/api/tasks/{task_id}/", headers=self.auth)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(await Task.objects.filter(id=task_id).aexists())
+
+    async def test_missing_fields(self):
+        response = await self.client.post(
+            "/api/tasks/",
+            {"title": "No assignee"},
+            content_type="application/json",
+            headers=self.auth,
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"message": "Title and Assigned To fields are required"}
+        )
+
+    async def test_rejects_unknown_choice(self):
+        response = await self.client.post(
+            "/api/tasks/",
+            {"title": "Mixed case", "assigned_to": self.other.email, "status": "Pending"},
+            content_type="application/json",
+            headers=self.auth,
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("status", response.json()["message"])
+        self.assertFalse(await Task.objects.filter(title="Mixed case").aexists())
+
+    async def test_report(self):
+        response = await self.client.get("/api/tasks/report/", headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {"completed_tasks": 0, "pending_tasks": 1, "tasks_by_priority": {"medium": 1}},
+        )
+
+    async def test_throttled(self):
+        with patch.object(AsyncUserRateThrottle, "get_rate", return_value="1/min"):
+            response = await self.client.get("/api/tasks/report/", headers=self.auth)
+            self.assertEqual(response.status_code, 200)
+            response = await self.client.get("/api/tasks/report/", headers=self.auth)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "60")
+
+
+class LowercaseChoicesMigrationTests(TestCase):
+    """Migration 0013 folds mixed-case choices into the stored lowercase values."""
+
+    def test_lowercases_tasks_stats_and_rollups(self):
+        owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        Task.objects.create(title="Lower", assigned_to=owner, created_by=owner)
+        mixed = Task.objects.create(title="Mixed", assigned_to=owner, created_by=owner)
+        Task.objects.filter(id=mixed.id).update(status="Pending", priority="MEDIUM")
+        reconcile_task_stats()
+        day = now().date()
+        TaskDailyRollup.objects.create(
+            day=day, assigned_to=owner, status="pending", priority="medium", count=1
+        )
+        TaskDailyRollup.objects.create(
+            day=day, assigned_to=owner, status="Pending", priority="MEDIUM", count=1
+        )
+
+        migration = import_module("tasks.migrations.0013_lowercase_choices")
+        migration.lowercase_choice_values(django_apps, None)
+
+        self.assertEqual(
+            list(Task.objects.values_list("status", "priority").distinct()),
+            [("pending", "medium")],
+        )
+        self.assertEqual(
+            {(row.status, row.priority): row.count for row in TaskStats.objects.all()},
+            {("pending", "medium"): 2},
+        )
+        self.assertEqual(
+            list(TaskDailyRollup.objects.values_list("status", "priority", "count")),
+            [("pending", "medium", 2)],
+        )
+
+
+class TaskSchemaTests(TestCase):
+    """The async task views are documented in the OpenAPI schema."""
+
+    def test_async_views_in_schema(self):
+        paths = self.client.get("/swagger.json").json()["paths"]
+        operations = {
+            path: sorted(method for method in paths.get(path, {}) if method != "parameters")
+            for path in ("/tasks/", "/tasks/{id}/", "/tasks/report/")
+        }
+        self.assertEqual(
+            operations,
+            {
+                "/tasks/": ["get", "post"],
+                "/tasks/{id}/": ["delete", "get", "put"],
+                "/tasks/report/": ["get"],
+            },
+        )
+        self.assertIn("results", str(paths["/tasks/"]["get"]["responses"]["200"]))
+        self.assertIn("/tasks/bulk/", paths)
+
+
+@override_settings(**TEST_SETTINGS)
+@patch("tasks.tasks.send_assignment_digests.apply_async")
+class TaskOutboxTests(TestCase):
+    """Side effects of a write are committed with it and delivered in order."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", "Owner", "password")
+        cls.bob = User.objects.create_user("bob@example.com", "Bob", "password")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def create(self, title, **fields):
+        response = self.client.post(
+            "/api/tasks/",
+            {
+                "title": title,
+                "priority": Task.Priority.MEDIUM,
+                "status": Task.Status.PENDING,
+                "assigned_to": "bob@example.com",
+                **fields,
+            },
+            format="json",
+        )
+        return response.json()["data"]["id"]
+
+    def sent_events(self, broadcasts):
+        return [
+            (event["op"], event["id"])
+            for call in broadcasts.call_args_list
+            for event in call.args[0][self.bob.id]
+        ]
+
+    @patch.object(outbox, "asend_to_audiences")
+    def test_delivered_after_commit(self, broadcasts, apply_async):
+        task_id = self.create("Soon", due_date=(now() + timedelta(hours=3)).isoformat())
+        self.client.put(f"/api/tasks/{task_id}/", {"title": "Sooner"}, format="json")
+        self.assertEqual(
+            list(TaskOutbox.objects.order_by("id").values_list("kind", flat=True)),
+            ["assignment_email", "deadline_reminder", "broadcast", "broadcast"],
+        )
+        broadcasts.assert_not_called()
+
+        with patch.object(send_deadline_reminder_chunk, "apply_async") as reminder:
+            self.assertEqual(outbox.drain_outbox(), 4)
+        apply_async.assert_called_once()
+        reminder.assert_called_once()
+        # Both broadcasts of the batch share one message per user.
+        broadcasts.assert_called_once()
+        self.assertEqual(broadcasts.call_args.args[0].keys(), {self.owner.id, self.bob.id})
+        self.assertEqual(self.sent_events(broadcasts), [("created", task_id), ("updated", task_id)])
+        self.assertFalse(TaskOutbox.objects.exists())
+
+    @patch.object(outbox, "asend_to_audiences")
+    def test_failure_holds_back_later_entries_of_the_task(self, broadcasts, apply_async):
+        apply_async.side_effect = [ConnectionError("broker down"), None, None]
+        failing = self.create("Failing")
+        self.client.put(f"/api/tasks/{failing}/", {"title": "Renamed"}, format="json")
+        cache.clear()
+        other = self.create("Other")
+
+        self.assertEqual(outbox.drain_outbox(), 2)
+        self.assertEqual(self.sent_events(broadcasts), [("created", other)])
+        held = TaskOutbox.objects.filter(task_id=failing).order_by("id")
+        self.assertEqual([entry.attempts for entry in held], [1, 0, 0])
+        self.assertEqual(held[0].last_error, "broker down")
+        self.assertGreater(held[0].available_at, now())
+        # Later entries are due but wait while the failed one is left.
+        self.assertEqual(outbox.drain_outbox(), 0)
+
+        # Once due, the held entries go out in their original order.
+        held.update(available_at=now())
+        cache.clear()
+        self.assertEqual(outbox.drain_outbox(), 3)
+        self.assertEqual(
+            self.sent_events(broadcasts)[1:], [("created", failing), ("updated", failing)]
+        )
+        self.assertFalse(TaskOutbox.objects.exists())
+
+    @patch.object(outbox, "asend_to_audiences")
+    def test_reminder_waits_for_earlier_broadcast(self, broadcasts, apply_async):
+        task_id = self.create("Undated")
+        due_date = (now() + timedelta(hours=3)).isoformat()
+        self.client.put(f"/api/tasks/{task_id}/", {"due_date": due_date}, format="json")
+        self.assertEqual(
+            list(TaskOutbox.objects.order_by("id").values_list("kind", flat=True)),
+            ["assignment_email", "broadcast", "deadline_reminder", "broadcast"],
+        )
+
+        # The reminder is never sent ahead of the failed "created" broadcast.
+        broadcasts.side_effect = ConnectionError("channel layer down")
+        with patch.object(send_deadline_reminder_chunk, "apply_async") as reminder:
+            self.assertEqual(outbox.drain_outbox(), 1)
+        reminder.assert_not_called()
+        self.assertEqual(
+            list(TaskOutbox.objects.order_by("id").values_list("attempts", flat=True)), [1, 0, 0]
+        )
+
+        sent = []
+        broadcasts.side_effect = lambda audiences: sent.append("broadcast")
+        TaskOutbox.objects.update(available_at=now())
+        with patch.object(send_deadline_reminder_chunk, "apply_async") as reminder:
+            reminder.side_effect = lambda *args, **kwargs: sent.append("reminder")
+            self.assertEqual(outbox.drain_outbox(), 3)
+        self.assertEqual(sent, ["broadcast", "reminder", "broadcast"])
+
+    @patch.object(outbox, "asend_to_audiences")
+    def test_write_after_failure_waits(self, broadcasts, apply_async):
+        apply_async.side_effect = [ConnectionError("broker down"), None]
+        task_id = self.create("Failing")
+        self.assertEqual(outbox.drain_outbox(), 0)
+
+        # Written after the retry was scheduled, so it is due before it.
+        cache.clear()
+        self.client.put(f"/api/tasks/{task_id}/", {"title": "Renamed"}, format="json")
+        self.assertEqual(outbox.drain_outbox(), 0)
+        broadcasts.assert_not_called()
+
+        TaskOutbox.objects.update(available_at=now())
+        self.assertEqual(outbox.drain_outbox(), 3)
+        self.assertEqual(self.sent_events(broadcasts), [("created", task_id), ("updated", task_id)])
+
+
+@override_settings(**TEST_SETTINGS)
+class TaskOutboxListenTests(TransactionTestCase):
+    """The dispatcher wakes on committed outbox inserts, across reconnects."""
+
+    def insert_later(self):
+        def insert():
+            time.sleep(0.2)
+            TaskOutbox.objects.create(task_id=1, kind=TaskOutbox.Kind.BROADCAST)
+            connection.close()
+
+        thread = threading.Thread(target=insert)
+        thread.start()
+        self.addCleanup(thread.join)
+
+    def assertWakesUp(self):
+        self.insert_later()
+        start = time.monotonic()
+        outbox.wait_for_outbox(5)
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_relistens_after_reconnect(self):
+        outbox.listen_for_outbox()
+        self.assertWakesUp()
+        connection.close()
+        self.assertWakesUp()
+
+
+@override_settings(**TEST_SETTINGS)
+class GenerateTasksTests(TestCase):
+    """Seeding loads exactly the requested rows, reproducibly for a given seed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            User.objects.create_user(f"user{i}@example.com", f"User {i}", "password")
+
+    def generate(self, seed):
+        call_command(
+            "generate_tasks",
+            rows=25,
+            workers=1,
+            batch_size=10,
+            seed=seed,
+            anchor_date="2026-01-01",
+            stdout=StringIO(),
+        )
+        return list(
+            Task.objects.order_by("id").values_list(
+                "title",
+                "description",
+                "priority",
+                "status",
+                "due_date",
+                "created_at",
+                "assigned_to_id",
+                "created_by_id",
+            )
+        )
+
+    def test_same_seed_same_tasks(self):
+        first = self.generate(seed=7)
+        self.assertEqual(len(first), 25)
+        self.assertEqual(reconcile_task_stats(), {})
+        self.assertFalse(Task.objects.filter(assignment_notified_at__isnull=True).exists())
+
+        Task.objects.all().delete()
+        self.assertEqual(self.generate(seed=7), first)
+        Task.objects.all().delete()
+        self.assertNotEqual(self.generate(seed=8), first)
+
+    def test_only_created_at_backdated(self):
+        self.generate(seed=7)
+        anchor = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        self.assertFalse(Task.objects.filter(created_at__gt=anchor).exists())
+        # Stamped when loaded, so syncs and rollups already past the
+        # backdated range still see the new rows.
+        self.assertFalse(Task.objects.exclude(updated_at=F("status_changed_at")).exists())
+        self.assertFalse(Task.objects.filter(updated_at__lte=anchor).exists())
@@ -1,228 +1,265 @@
-from collections import Counter
-from concurrent.futures import ThreadPoolExecutor
+import os
 from datetime import datetime
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
-from rest_framework.mixins import ListModelMixin
 from rest_framework.decorators import action
 from rest_framework.status import (
     HTTP_200_OK,
     HTTP_400_BAD_REQUEST,
-    HTTP_201_CREATED,
-    HTTP_204_NO_CONTENT,
+    HTTP_202_ACCEPTED,
+    HTTP_410_GONE,
 )
 from django.shortcuts import get_object_or_404
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
-from django.core.cache import cache
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.parsers import MultiPartParser
 from urllib.parse import urlencode
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-from concurrent.futures import ThreadPoolExecutor
-from django.http import HttpResponse
-from io import StringIO
-import csv
+from django.http import StreamingHttpResponse
+from django.utils.cache import quote_etag
 from rest_framework.throttling import UserRateThrottle
 
-from users.models import User
-from .serializers import TaskSerializer
-from .models import Task
-from .tasks import send_task_assignment_email
+from .serializers import ExportJobSerializer, TaskSerializer
+from .bulk import apply_bulk
+from .cache import (
+    PIVOT_CACHE_TIMEOUT,
+    PIVOT_NAMESPACE,
+    get_cache_stats,
+    get_or_compute,
+    namespaced_key,
+)
+from .exports import (
+    EXPORT_WRITERS,
+    aiter_chunks,
+    export_rows,
+    iter_csv,
+    iter_gzip,
+    parquet_available,
+    ranged_file_response,
+)
+from .filters import FILTER_PARAMS, filter_tasks, search_tasks
+from .imports import import_tasks_csv
+from .models import ExportJob, Task
+from .pagination import TaskPageNumberPagination, task_paginator
+from .pivot import compute_pivot, parse_dimensions
+from .rollups import rollup_series
+from .sync import SyncTokenExpired, changes_since, sync_page_size
+from .tasks import run_export_job
 
-# Route - /tasks/
+# Route - /tasks/ (list, detail and report are served by async_views)
 
 
-class TasksViewSet(GenericViewSet, ListModelMixin):
-    queryset = Task.objects.all()
+class TasksViewSet(GenericViewSet):
+    queryset = Task.objects.select_related("assigned_to", "created_by").defer(
+        "search_vector"
+    )
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = PageNumberPagination
+    pagination_class = TaskPageNumberPagination
     throttle_classes = [UserRateThrottle]
 
-    def retrieve(self, request, *args, **kwargs):
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            self._paginator = task_paginator(self.request)
+        return self._paginator
+
+    @action(detail=False, methods=["POST"], url_path="bulk")
+    def bulk(self, request):
         try:
-            task = get_object_or_404(Task, id=kwargs.get("pk"))
-            serializer = self.serializer_class(task)
-            return Response(serializer.data, status=HTTP_200_OK)
+            result = apply_bulk(request.data, request.user)
+            changes = {
+                "created": result.created_data,
+                "updated": result.updated_data,
+                "deleted": result.deleted,
+            }
+            return Response(
+                {"message": "Bulk Completed", "data": {**changes, "errors": result.errors}},
+                status=HTTP_200_OK,
+            )
         except Exception as error:
             return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
 
-    def get_cache_key(self, request):
-        params = request.GET.dict()
-        sorted_params = sorted(params.items())
-        encoded = urlencode(sorted_params)
-        return f"tasks_list:{request.user.id}:{encoded}"
-
-    def list(self, request, *args, **kwargs):
-        cache_key = self.get_cache_key(request)
-        cached_data = cache.get(cache_key)
-        
-        if cached_data is not None:
-            return Response(cached_data, status=HTTP_200_OK)
+    @action(detail=False, methods=["GET"], url_path="search")
+    def search(self, request):
         try:
-            title = request.GET.get("title", None)
-            description = request.GET.get("description", None)
-            priority = request.GET.get("priority", None)
-            due_date = request.GET.get("due_date", None)
-            status = request.GET.get("status", None)
-            assigned_to = request.GET.get("assigned_to", None)
-
-            filters = {}
-            if title:
-                filters["title__icontains"] = title
-            if description:
-                filters["description__icontains"] = description
-            if priority:
-                filters["priority__iexact"] = priority
-            if due_date:
-                filters["due_date__date"] = due_date
-            if status:
-                filters["status__iexact"] = status
-            if assigned_to:
-                filters["assigned_to__email__iexact"] = assigned_to
-
-            tasks = self.queryset.filter(**filters)
+            query = request.GET.get("q", "").strip()
+            if not query:
+                return Response(
+                    {"message": "Query parameter q is required"},
+                    status=HTTP_400_BAD_REQUEST,
+                )
+
+            tasks = search_tasks(filter_tasks(self.get_queryset(), request.GET), query)
             page = self.paginate_queryset(tasks)
 
             if page is not None:
                 serializer = self.get_serializer(page, many=True)
-                cache.set(cache_key, serializer.data, timeout=60)
                 return self.get_paginated_response(serializer.data)
 
             serializer = self.get_serializer(tasks, many=True)
-            cache.set(cache_key, serializer.data, 60)
             return Response(serializer.data, status=HTTP_200_OK)
         except Exception as error:
             return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
 
-    def post(self, request, *args, **kwargs):
+    @action(detail=False, methods=["GET"], url_path="pivot")
+    def pivot(self, request):
         try:
-            title = request.data.get("title")
-            description = request.data.get("description")
-            priority = request.data.get("priority")
-            due_date = request.data.get("due_date")
-            status = request.data.get("status")
-            assigned_to = request.data.get("assigned_to")
-
-            if not title or not assigned_to:
-                return Response(
-                    {"message": "Title and Assigned To fields are required"},
-                    status=HTTP_400_BAD_REQUEST,
-                )
-
-            assigned_to = get_object_or_404(User, email=assigned_to)
-
-            task = Task.objects.create(
-                title=title,
-                description=description,
-                priority=priority,
-                due_date=due_date,
-                status=status,
-                assigned_to=assigned_to,
-                created_by=request.user,
-            )
-            send_task_assignment_email.delay(task.id)
-
-            serializer = self.get_serializer(task)
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                "tasks",
-                {
-                    "type": "send_task_update",
-                    "message": serializer.data
-                }
-            )
-            return Response(
-                {"message": "Task Created", "data": serializer.data},
-                status=HTTP_201_CREATED,
+            dims = parse_dimensions(request.GET.get("dims"))
+            params = {key: request.GET[key] for key in FILTER_PARAMS if request.GET.get(key)}
+            suffix = urlencode([("dims", ",".join(dims))] + sorted(params.items()))
+            result = get_or_compute(
+                namespaced_key(PIVOT_NAMESPACE, suffix),
+                lambda: compute_pivot(params, dims),
+                PIVOT_CACHE_TIMEOUT,
+                PIVOT_NAMESPACE,
             )
+            return Response(result, status=HTTP_200_OK)
         except Exception as error:
             return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
 
-    def put(self, request, *args, **kwargs):
+    @action(detail=False, methods=["GET"], url_path="analytics")
+    def analytics(self, request):
         try:
-            task = get_object_or_404(Task, id=kwargs.get("pk"), created_by=request.user)
-            serializer = self.serializer_class(task, data=request.data, partial=True)
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f'task_{kwargs.get("pk")}',  # Specific task group
-                {
-                    "type": "send_task_update",
-                    "message": serializer.data
-                }
-            )
-            return Response(
-                {"message": "Task Updated", "data": serializer.data}, status=HTTP_200_OK
+            return Response(rollup_series(request.GET), status=HTTP_200_OK)
+        except Exception as error:
+            return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=["GET"], url_path="changes")
+    def changes(self, request):
+        try:
+            page = changes_since(
+                self.get_queryset(),
+                request.GET.get("since"),
+                sync_page_size(request.GET.get("page_size")),
             )
+            page["changed"] = self.get_serializer(page["changed"], many=True).data
+            return Response(page, status=HTTP_200_OK)
+        except SyncTokenExpired as error:
+            return Response({"message": str(error)}, status=HTTP_410_GONE)
         except Exception as error:
             return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
 
-    def destroy(self, request, *args, **kwargs):
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="cache-stats",
+        permission_classes=[IsAdminUser],
+    )
+    def cache_stats(self, request):
         try:
-            task = get_object_or_404(Task, id=kwargs.get("pk"), created_by=request.user)
-            task.delete()
-            return Response({"message": "Task Deleted"}, status=HTTP_204_NO_CONTENT)
+            return Response(get_cache_stats(), status=HTTP_200_OK)
         except Exception as error:
             return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
 
-    @action(detail=False, methods=["GET"], url_path="report")
-    def generate_report(self, request):
+    @action(detail=False, methods=["GET"], url_path="export")
+    def export_tasks(self, request):
         try:
-            tasks = Task.objects.values("priority", "status")
+            # Build the queryset up front so bad filters still get a 400
+            # before the streaming response has sent its headers.
+            rows = export_rows(filter_tasks(Task.objects.all(), request.GET))
+            content = iter_csv(rows)
+            content_type = "text/csv"
+            filename = "tasks_export.csv"
+
+            if request.GET.get("compress") == "gzip":
+                content = iter_gzip(content)
+                content_type = "application/gzip"
+                filename += ".gz"
+
+            response = StreamingHttpResponse(aiter_chunks(content), content_type=content_type)
+            response["Content-Disposition"] = f"attachment; filename={filename}"
+            return response
+
+        except Exception as error:
+            return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
 
-            def count_completed():
-                return tasks.filter(status=Task.Status.COMPLETED).count()
+    @action(
+        detail=False, methods=["POST"], url_path="import", parser_classes=[MultiPartParser]
+    )
+    def import_tasks(self, request):
+        try:
+            upload = request.FILES.get("file")
+            if upload is None:
+                return Response(
+                    {"message": "A CSV file is required in the 'file' field"},
+                    status=HTTP_400_BAD_REQUEST,
+                )
+            # Large uploads are spooled to disk by Django and read in chunks here.
+            result = import_tasks_csv(upload, created_by=request.user)
+            return Response(
+                {"message": "Import Completed", "data": result.as_dict()}, status=HTTP_200_OK
+            )
+        except Exception as error:
+            return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
 
-            def count_pending():
-                return tasks.filter(status=Task.Status.PENDING).count()
+    @action(detail=False, methods=["GET", "POST"], url_path="export-jobs")
+    def export_jobs(self, request):
+        try:
+            if request.method == "GET":
+                jobs = ExportJob.objects.filter(created_by=request.user).order_by("-id")
+                page = self.paginate_queryset(jobs)
+                serializer = ExportJobSerializer(
+                    page, many=True, context=self.get_serializer_context()
+                )
+                return self.get_paginated_response(serializer.data)
 
-            def categorize_by_priority():
-                priority_counts = Counter(task["priority"] for task in tasks)
-                return dict(priority_counts)
+            export_format = request.data.get("format", ExportJob.Format.CSV)
+            if export_format not in ExportJob.Format.values:
+                return Response(
+                    {"message": f"Unsupported format '{export_format}'"},
+                    status=HTTP_400_BAD_REQUEST,
+                )
+            if export_format == ExportJob.Format.PARQUET and not parquet_available():
+                return Response(
+                    {"message": "Parquet export is not available on this server"},
+                    status=HTTP_400_BAD_REQUEST,
+                )
 
-            with ThreadPoolExecutor(max_workers=3) as executor:
-                completed_future = executor.submit(count_completed)
-                pending_future = executor.submit(count_pending)
-                priority_future = executor.submit(categorize_by_priority)
+            filters = {key: request.data[key] for key in FILTER_PARAMS if request.data.get(key)}
+            filter_tasks(Task.objects.none(), filters)  # Reject bad filters now, not in the worker.
 
-                completed_count = completed_future.result()
-                pending_count = pending_future.result()
-                priority_stats = priority_future.result()
+            job = ExportJob.objects.create(
+                format=export_format, filters=filters, created_by=request.user
+            )
+            run_export_job.delay(job.id)
 
+            serializer = ExportJobSerializer(job, context=self.get_serializer_context())
             return Response(
-                {
-                    "completed_tasks": completed_count,
-                    "pending_tasks": pending_count,
-                    "tasks_by_priority": priority_stats,
-                },
-                status=HTTP_200_OK,
+                {"message": "Export Started", "data": serializer.data},
+                status=HTTP_202_ACCEPTED,
             )
-
         except Exception as error:
             return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
-        
-    @action(detail=False, methods=["GET"], url_path="export")
-    def export_tasks(self, request):
+
+    @action(detail=False, methods=["GET"], url_path=r"export-jobs/(?P<job_id>[0-9]+)")
+    def export_job_status(self, request, job_id=None):
         try:
-            def generate_csv():
-                tasks = Task.objects.all().values("title", "description", "priority", "due_date", "status", "created_by__email", "assigned_to__email")
-                output = StringIO()
-                writer = csv.DictWriter(output, fieldnames=["title", "description", "priority", "due_date", "status", "created_by__email", "assigned_to__email"])
-                writer.writeheader()
-                for task in tasks:
-                    writer.writerow(task)
-                output.seek(0)
-                return output.getvalue()
-
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(generate_csv)
-                csv_data = future.result()
-
-            response = HttpResponse(csv_data, content_type="text/csv")
-            response["Content-Disposition"] = "attachment; filename=tasks_export.csv"
-            return response
+            job = get_object_or_404(ExportJob, id=job_id, created_by=request.user)
+            serializer = ExportJobSerializer(job, context=self.get_serializer_context())
+            return Response(serializer.data, status=HTTP_200_OK)
+        except Exception as error:
+            return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
 
+    @action(
+        detail=False, methods=["GET"], url_path=r"export-jobs/(?P<job_id>[0-9]+)/download"
+    )
+    def download_export_job(self, request, job_id=None):
+        try:
+            job = get_object_or_404(
+                ExportJob,
+                id=job_id,
+                created_by=request.user,
+                status=ExportJob.Status.COMPLETED,
+            )
+            writer_class = EXPORT_WRITERS[job.format]
+            # A finished job's file never changes, so its id pins the content.
+            return ranged_file_response(
+                request,
+                job.file.open("rb"),
+                job.file.size,
+                writer_class.content_type,
+                os.path.basename(job.file.name),
+                etag=quote_etag(f"export-{job.id}"),
+                last_modified=int(job.completed_at.timestamp()),
+            )
         except Exception as error:
-            return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            return Response({"message": str(error)}, status=HTTP_400_BAD_REQUEST)
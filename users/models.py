@@ -4,6 +4,7 @@ from django.contrib.auth.models import (
     BaseUserManager,
     PermissionsMixin,
 )
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
 # Create your models here.
@@ -43,6 +44,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         app_label = "users"
         ordering = ("name",)
+        indexes = [models.Index(Lower("email"), name="user_email_lower_idx")]
 
     def __str__(self):
         return f"{self.name}-{self.email}"